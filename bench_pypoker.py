@@ -0,0 +1,256 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+from pypoker import Card
+from pypoker import Deck
+from pypoker import Hand
+from pypoker import PokerRules
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SEED = 20161018
+
+RANKS = sorted(Card.VALUES, key=Card.VALUES.get)
+
+PATTERNS = {
+    PokerRules.HIGH_CARD: [1, 1, 1, 1, 1],
+    PokerRules.ONE_PAIR: [2, 1, 1, 1],
+    PokerRules.TWO_PAIR: [2, 2, 1],
+    PokerRules.TREE_OF_A_KIND: [3, 1, 1],
+    PokerRules.FULL_HOUSE: [3, 2],
+    PokerRules.FOUR_OF_A_KIND: [4, 1],
+}
+
+PREDICATES = [
+    'is_royal_flush', 'is_straight_flush', 'is_four_of_a_kind',
+    'is_full_house', 'is_flush', 'is_straight', 'is_tree_of_a_kind',
+    'is_two_pair', 'is_one_pair', 'is_high_card',
+]
+
+
+def make_hand(rng, numeric_value):
+    # Builds a random hand of the given numeric value, retrying until the
+    # rules agree (e.g. five random ranks may happen to be a straight).
+    while True:
+        if numeric_value in PATTERNS:
+            ranks = rng.sample(RANKS, len(PATTERNS[numeric_value]))
+            cards = [
+                Card(rank, suit)
+                for rank, amount in zip(ranks, PATTERNS[numeric_value])
+                for suit in rng.sample(Card.SUITS_ORDER, amount)
+            ]
+        elif numeric_value == PokerRules.FLUSH:
+            suit = rng.choice(Card.SUITS_ORDER)
+            cards = [Card(rank, suit) for rank in rng.sample(RANKS, 5)]
+        elif numeric_value == PokerRules.STRAIGHT:
+            high = rng.randrange(4, len(RANKS))
+            cards = [
+                Card(RANKS[rank], rng.choice(Card.SUITS_ORDER))
+                for rank in range(high - 4, high + 1)
+            ]
+        else:
+            high = len(RANKS) - 1
+            if numeric_value == PokerRules.STRAIGHT_FLUSH:
+                high = rng.randrange(4, len(RANKS) - 1)
+            suit = rng.choice(Card.SUITS_ORDER)
+            cards = [
+                Card(RANKS[rank], suit) for rank in range(high - 4, high + 1)
+            ]
+
+        rng.shuffle(cards)
+        hand = Hand(cards)
+        if PokerRules.classify(hand) == numeric_value:
+            return hand
+
+
+def fresh_hands(hands):
+    # New Hands with an empty cache, so nothing has been evaluated yet.
+    PokerRules.cache.clear()
+    return [Hand(hand.cards) for hand in hands]
+
+
+def fresh_pairs(pairs):
+    PokerRules.cache.clear()
+    return [(Hand(hand.cards), Hand(other.cards)) for hand, other in pairs]
+
+
+def random_hands(amount, seed=SEED):
+    deck = Deck(seed=seed)
+    hands = []
+    for _ in range(amount):
+        deck.shuffle()
+        hands.append(deck.deal_hand())
+    return hands
+
+
+def get_benchmarks(size):
+    rng = random.Random(SEED)
+    hands = random_hands(size)
+    card_strings = [str(card) for hand in hands for card in hand.cards]
+    hand_strings = [' '.join(str(card) for card in hand.cards)
+                    for hand in hands]
+    benchmarks = []
+
+    def add(name, func, setup=lambda: (), operations=size):
+        benchmarks.append((name, func, setup, operations))
+
+    add('card.parse_from_string',
+        lambda: [Card.parse_from_string(card) for card in card_strings],
+        operations=len(card_strings))
+    add('hand.from_string',
+        lambda: [Hand.from_string(hand) for hand in hand_strings])
+
+    for predicate in PREDICATES:
+        add('rules.%s' % predicate,
+            lambda method=getattr(PokerRules, predicate):
+            [method(hand) for hand in hands])
+
+    add('rules.get_numeric_value_by_hand',
+        lambda cold_hands: [PokerRules.get_numeric_value_by_hand(hand)
+                            for hand in cold_hands],
+        lambda: (fresh_hands(hands),))
+
+    for numeric_value, name in sorted(PokerRules.VALUES.items()):
+        pairs = [
+            (make_hand(rng, numeric_value), make_hand(rng, numeric_value))
+            for _ in range(min(size, 1000))
+        ]
+        add('hand.compare.%s' % name.lower().replace(' ', '_'),
+            lambda cold_pairs: [hand < other for hand, other in cold_pairs],
+            lambda pairs=pairs: (fresh_pairs(pairs),),
+            operations=len(pairs))
+
+    add('hand.sort',
+        lambda cold_hands: sorted(cold_hands, key=Hand.strength_key),
+        lambda: (fresh_hands(hands),))
+
+    # Comparisons of hands that are already evaluated, only the cost of the
+    # comparison protocol itself.
+    warm_pairs = list(zip(hands, hands[1:] + hands[:1]))
+    for hand in hands:
+        hand.strength
+    add('hand.compare.warm',
+        lambda: [hand < other for hand, other in warm_pairs])
+    add('hand.equal.warm',
+        lambda: [hand == other for hand, other in warm_pairs])
+    add('hand.sort.warm', lambda: sorted(hands))
+
+    cards = [card for hand in hands for card in hand.cards]
+    card_pairs = list(zip(cards, cards[1:] + cards[:1]))
+    add('card.compare',
+        lambda: [card < other for card, other in card_pairs],
+        operations=len(card_pairs))
+
+    if numpy is not None:
+        card_ints = numpy.array([hand.to_ints() for hand in hands])
+        add('rules.evaluate_batch',
+            lambda: PokerRules.evaluate_batch(card_ints))
+
+    return benchmarks
+
+
+def run(size=100000, repeat=5, name_filter=None):
+    results = []
+
+    for name, func, setup, operations in get_benchmarks(size):
+        if name_filter and name_filter not in name:
+            continue
+
+        times = []
+        for _ in range(repeat):
+            args = setup()
+            start = timeit.default_timer()
+            func(*args)
+            times.append(timeit.default_timer() - start)
+
+        times.sort()
+        results.append({
+            'name': name,
+            'operations': operations,
+            'repeat': repeat,
+            'min': times[0],
+            'median': times[len(times) // 2],
+            'max': times[-1],
+            'min_per_operation': times[0] / operations,
+        })
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'seed': SEED,
+        'size': size,
+        'benchmarks': results,
+    }
+
+
+def compare(before, after):
+    # Min time per operation of the benchmarks in both runs, e.g. of two
+    # versions or interpreters, and how many times faster the second is.
+    after_benchmarks = dict(
+        (benchmark['name'], benchmark) for benchmark in after['benchmarks']
+    )
+    comparison = []
+
+    for benchmark in before['benchmarks']:
+        if benchmark['name'] not in after_benchmarks:
+            continue
+
+        before_time = benchmark['min_per_operation']
+        after_time = after_benchmarks[benchmark['name']]['min_per_operation']
+        comparison.append({
+            'name': benchmark['name'],
+            'before': before_time,
+            'after': after_time,
+            'speedup': before_time / after_time,
+        })
+
+    return {
+        'before': before['python'],
+        'after': after['python'],
+        'benchmarks': comparison,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the pypoker parse, classify, compare and '
+                    'batch paths.'
+    )
+    parser.add_argument('--size', type=int, default=100000,
+                        help='hands per benchmark (default: 100000)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per benchmark (default: 5)')
+    parser.add_argument('--filter', dest='name_filter',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='JSON file (default: stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='compare two result files instead of running')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as before_file:
+            before = json.load(before_file)
+        with open(args.compare[1]) as after_file:
+            after = json.load(after_file)
+        results = compare(before, after)
+    else:
+        results = run(args.size, args.repeat, args.name_filter)
+    output = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+import argparse
+import timeit
+
+from pypoker import PreflopEquity
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Enumerates the exact heads-up preflop equity of every '
+                    'pair of starting hand classes and writes the table.'
+    )
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes (default: 1)')
+    parser.add_argument('--output', default=PreflopEquity.PATH,
+                        help='table file (default: %s)' % PreflopEquity.PATH)
+    args = parser.parse_args(argv)
+
+    start = timeit.default_timer()
+    table = PreflopEquity.generate(workers=args.workers)
+    PreflopEquity.save(args.output, table)
+    print('Wrote %s in %.1fs' % (args.output,
+                                 timeit.default_timer() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,23 @@
+import array
+import bisect
+import collections
+import itertools
+import math
+import mmap
+import os
+import pickle
+import random
+import sys
+import threading
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
 class Card(object):
     SUITS = {
         'C': True,
@@ -22,12 +42,42 @@ class Card(object):
         'A': 14
     }
 
-    def __init__(self, value, suit):
-        if not self.is_valid_card(value, suit):
+    # Cactus Kev style encoding: xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp, where
+    # b is one bit per rank, cdhs the suit bit, r the rank and p its prime.
+    PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+    SUIT_BITS = {
+        'C': 0x8000,
+        'D': 0x4000,
+        'H': 0x2000,
+        'S': 0x1000
+    }
+
+    # Card indexes go from 0 (2C) to 51 (AS), four suits per value.
+    SUITS_ORDER = 'CDHS'
+
+    __slots__ = ('value', 'suit', 'numeric_value', '_int', '_index')
+
+    # There are only 52 cards, all created once when the module is loaded
+    # and shared by every hand.
+    _cards = {}
+    _cards_by_int = {}
+    _cards_by_index = [None] * 52
+
+    def __new__(cls, value, suit):
+        try:
+            return cls._cards[value, suit]
+        except (KeyError, TypeError):
             raise ValueError('Invalid suit or value %s%s' % (value, suit))
 
-        self.value = value.upper()
-        self.suit = suit.upper()
+    def __setattr__(self, name, value):
+        raise AttributeError('Card is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Card is immutable')
+
+    def __reduce__(self):
+        return (Card, (self.value, self.suit))
 
     def __str__(self):
         return '%s%s' % (self.value, self.suit)
@@ -35,8 +85,39 @@ class Card(object):
     def __repr__(self):
         return self.__str__()
 
-    def __cmp__(self, other):
-        return cmp(self.numeric_value, other.numeric_value)
+    # Cards compare and hash by value only, whatever their suits.
+    def __eq__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value == other.numeric_value
+
+    def __ne__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value != other.numeric_value
+
+    def __lt__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value < other.numeric_value
+
+    def __le__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value <= other.numeric_value
+
+    def __gt__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value > other.numeric_value
+
+    def __ge__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.numeric_value >= other.numeric_value
+
+    def __hash__(self):
+        return self.numeric_value
 
     @classmethod
     def is_valid_suit(cls, suit):
@@ -59,9 +140,49 @@ class Card(object):
         value = card_string[0]
         return cls(value, suit)
 
-    @property
-    def numeric_value(self):
-        return self.VALUES.get(self.value)
+    @classmethod
+    def from_int(cls, card_int):
+        try:
+            return cls._cards_by_int[card_int]
+        except (KeyError, TypeError):
+            raise ValueError('Invalid card int %s' % card_int)
+
+    @classmethod
+    def from_index(cls, index):
+        if not 0 <= index < 52:
+            raise ValueError('Invalid card index %s' % index)
+
+        return cls._cards_by_index[index]
+
+    def to_index(self):
+        return self._index
+
+    def to_int(self):
+        return self._int
+
+    @classmethod
+    def _intern_cards(cls):
+        for value, numeric_value in cls.VALUES.items():
+            for suit in cls.SUITS:
+                rank = numeric_value - 2
+                card = object.__new__(cls)
+                attributes = {
+                    'value': value,
+                    'suit': suit,
+                    'numeric_value': numeric_value,
+                    '_int': ((1 << (16 + rank)) | cls.SUIT_BITS[suit] |
+                             (rank << 8) | cls.PRIMES[rank]),
+                    '_index': rank * 4 + cls.SUITS_ORDER.index(suit),
+                }
+                for name, attribute in attributes.items():
+                    object.__setattr__(card, name, attribute)
+
+                cls._cards[value, suit] = card
+                cls._cards_by_int[card.to_int()] = card
+                cls._cards_by_index[card.to_index()] = card
+
+
+Card._intern_cards()
 
 
 class Hand(object):
@@ -70,32 +191,73 @@ class Hand(object):
     def __init__(self, cards=[]):
         self.cards = cards
 
+    @property
+    def cards(self):
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards):
+        # The evaluation is cached until the cards are reassigned, changing
+        # the list in place does not invalidate it.
+        self._cards = cards
+        self._sorted_cards = None
+        self._numeric_value = None
+        self._strength = None
+        self._tie_break_key = None
+
     def __str__(self):
         return "<hand %s, '%s'>" % (self.cards, self.hand_value)
 
     def __repr__(self):
         return self.__str__()
 
-    def __cmp__(self, other_hand):
-        hand_value = PokerRules.get_numeric_value_by_hand(self)
-        other_hand_value = PokerRules.get_numeric_value_by_hand(other_hand)
-
-        if hand_value == other_hand_value:
-            return PokerRules.cmp_hands(self, other_hand, hand_value)
-        return cmp(hand_value, other_hand_value)
+    # Hands compare by their strength, which is evaluated once and kept
+    # until the cards are reassigned.
+    def __eq__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength == other_hand.strength
+
+    def __ne__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength != other_hand.strength
+
+    def __lt__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength < other_hand.strength
+
+    def __le__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength <= other_hand.strength
+
+    def __gt__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength > other_hand.strength
+
+    def __ge__(self, other_hand):
+        if not isinstance(other_hand, Hand):
+            return NotImplemented
+        return self.strength >= other_hand.strength
+
+    def __hash__(self):
+        return hash(self.strength)
 
     @classmethod
     def parse_cards_string(cls, cards_string, cards=[], number_of_cards=0):
-        if not cards_string or number_of_cards >= cls.MAX_CARDS:
-            return cards
+        cards = list(cards)
 
-        card = Card.parse_from_string(cards_string[:2])
+        for start in range(0, len(cards_string), 3):
+            if number_of_cards >= cls.MAX_CARDS:
+                break
 
-        return cls.parse_cards_string(
-            cards_string[3:],
-            cards + [card],
-            number_of_cards + 1
-        )
+            cards.append(Card.parse_from_string(cards_string[start:start + 2]))
+            number_of_cards += 1
+
+        return cards
 
     @classmethod
     def from_string(cls, cards_string):
@@ -104,10 +266,84 @@ class Hand(object):
             raise ValueError('5 cards required %s given' % hand.amount_of_cards)
         return hand
 
+    @classmethod
+    def from_ints(cls, card_ints):
+        hand = Hand([Card.from_int(card_int) for card_int in card_ints])
+        if not hand.has_correct_amount_of_cards():
+            raise ValueError(
+                '5 cards required %s given' % hand.amount_of_cards()
+            )
+        return hand
+
+    @classmethod
+    def iter_hands(cls, file_obj, as_ints=False):
+        # Lazily parses one hand per line, yielding Hands or, with as_ints,
+        # tuples of card ints. Blank lines are skipped.
+        card_ints = dict(
+            ('%s%s' % (value, suit), Card(value, suit).to_int())
+            for value in Card.VALUES for suit in Card.SUITS
+        )
+
+        for line_number, line in enumerate(file_obj, 1):
+            card_strings = line.split()
+            if not card_strings:
+                continue
+
+            if len(card_strings) != cls.MAX_CARDS:
+                raise ValueError('5 cards required %s given on line %s' %
+                                 (len(card_strings), line_number))
+
+            try:
+                hand_ints = tuple(card_ints[card] for card in card_strings)
+            except KeyError as error:
+                raise ValueError('Invalid card %s on line %s' %
+                                 (error.args[0], line_number))
+
+            if as_ints:
+                yield hand_ints
+            else:
+                yield cls([Card.from_int(card_int) for card_int in hand_ints])
+
+    @classmethod
+    def best_of(cls, cards):
+        return PokerRules.best_hand(cards)[0]
+
+    def to_ints(self):
+        return [card.to_int() for card in self.cards]
+
+    def canonical_index(self):
+        return PokerRules.get_canonical_index_by_ints(self.to_ints())
+
+    def strength_key(self):
+        # The strength orders hands by category first and then by the ranks
+        # that break ties within it.
+        return self.strength
+
     @property
     def hand_value(self):
         return PokerRules.get_value_by_hand(self)
 
+    def _evaluate(self):
+        self._numeric_value, self._strength = PokerRules.evaluate(self)
+
+    @property
+    def numeric_value(self):
+        if self._numeric_value is None:
+            self._evaluate()
+        return self._numeric_value
+
+    @property
+    def strength(self):
+        if self._strength is None:
+            self._evaluate()
+        return self._strength
+
+    @property
+    def tie_break_key(self):
+        if self._tie_break_key is None:
+            self._tie_break_key = PokerRules.get_tie_break_key(self)
+        return self._tie_break_key
+
     def amount_of_cards(self):
         return len(self.cards)
 
@@ -116,7 +352,142 @@ class Hand(object):
 
     @property
     def sorted_cards(self):
-        return sorted(self.cards)
+        if self._sorted_cards is None:
+            self._sorted_cards = sorted(self.cards)
+        return self._sorted_cards
+
+
+class Deck(object):
+    # The cards live in one array: the undealt ones first, then the dealt
+    # ones and finally the removed (dead) ones. Dealing swaps a random
+    # undealt card to the end of the undealt ones, so shuffling only costs
+    # as much as the cards that are actually dealt.
+    def __init__(self, dead_cards=(), rng=None, seed=None):
+        self.rng = rng or random.Random(seed)
+        self._cards = array.array('l', sorted(Card._cards_by_int))
+        self._positions = dict(
+            (card_int, position) for position, card_int
+            in enumerate(self._cards)
+        )
+        self._size = len(self._cards)
+        self._remaining = self._size
+        self.remove(dead_cards)
+
+    def __len__(self):
+        return self._remaining
+
+    def _swap(self, position, other_position):
+        cards = self._cards
+        card_int, other_card_int = cards[position], cards[other_position]
+        cards[position], cards[other_position] = other_card_int, card_int
+        self._positions[card_int] = other_position
+        self._positions[other_card_int] = position
+
+    def shuffle(self):
+        self._remaining = self._size
+
+    def remove(self, cards):
+        self.remove_ints([card.to_int() for card in cards])
+
+    def remove_ints(self, card_ints):
+        for card_int in card_ints:
+            position = self._positions.get(card_int)
+            if position is None or position >= self._remaining:
+                raise ValueError('Card not in deck %s' %
+                                 Card.from_int(card_int))
+
+            self._swap(position, self._remaining - 1)
+            self._swap(self._remaining - 1, self._size - 1)
+            self._remaining -= 1
+            self._size -= 1
+
+    def deal_ints(self, amount):
+        if amount > self._remaining:
+            raise ValueError('Only %s cards left %s required' %
+                             (self._remaining, amount))
+
+        cards = self._cards
+        positions = self._positions
+        rng_random = self.rng.random
+        remaining = self._remaining
+
+        for _ in range(amount):
+            position = int(rng_random() * remaining)
+            remaining -= 1
+            card_int, last_card_int = cards[position], cards[remaining]
+            cards[position], cards[remaining] = last_card_int, card_int
+            positions[card_int] = remaining
+            positions[last_card_int] = position
+
+        self._remaining = remaining
+        return cards[remaining:remaining + amount].tolist()
+
+    def deal(self, amount):
+        return [Card.from_int(card_int) for card_int in self.deal_ints(amount)]
+
+    def deal_hand(self):
+        return Hand(self.deal(Hand.MAX_CARDS))
+
+
+class LRUCache(object):
+    def __init__(self, capacity):
+        if capacity < 0:
+            raise ValueError('Invalid capacity %s' % capacity)
+        self.capacity = capacity
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            self._evict()
+
+    def resize(self, capacity):
+        if capacity < 0:
+            raise ValueError('Invalid capacity %s' % capacity)
+        with self._lock:
+            self.capacity = capacity
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        return {
+            'capacity': self.capacity,
+            'size': len(self._items),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def _evict(self):
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+            self.evictions += 1
 
 
 class PokerRules(object):
@@ -144,6 +515,19 @@ class PokerRules(object):
         ROYAL_FLUSH: 'Royal Flush'
     }
 
+    WHEEL_MASK = 0b100000000111100
+
+    cache = LRUCache(int(os.environ.get('PYPOKER_CACHE_SIZE', 100000)))
+
+    STRAIGHT_MASKS = frozenset(
+        [0b11111 << lowest for lowest in range(2, 11)] + [WHEEL_MASK]
+    )
+
+    # Rank indexes (0 for deuces) of each straight, from the highest one.
+    RANK_STRAIGHTS = [
+        list(range(high, high - 5, -1)) for high in range(12, 3, -1)
+    ] + [[3, 2, 1, 0, 12]]
+
     @classmethod
     def _get_cards_dict(cls, hand):
         cards_dict = {}
@@ -155,137 +539,160 @@ class PokerRules(object):
         return cards_dict
 
     @classmethod
-    def _get_amount_of_a_kind(cls, hand):
-        return cls._get_cards_dict(hand).values()
+    def _get_hand_profile(cls, hand):
+        # (amounts of a kind in descending order, is flush, is straight,
+        # lowest numeric value), built from a single scan of the cards.
+        cards_dict = {}
+        suits = set()
+        mask = 0
+
+        for card in hand.cards:
+            numeric_value = card.numeric_value
+            cards_dict[numeric_value] = cards_dict.get(numeric_value, 0) + 1
+            suits.add(card.suit)
+            mask |= 1 << numeric_value
+
+        amounts = sorted(cards_dict.values(), reverse=True)
+        is_flush = len(suits) == 1 and len(hand.cards) == hand.MAX_CARDS
+        is_straight = mask in cls.STRAIGHT_MASKS
+        lowest = min(cards_dict) if cards_dict else None
+
+        return amounts, is_flush, is_straight, lowest
+
+    @classmethod
+    def _get_value_by_profile(cls, profile):
+        amounts, is_flush, is_straight, lowest = profile
+
+        if is_flush and is_straight:
+            if lowest == 10:
+                return cls.ROYAL_FLUSH
+            return cls.STRAIGHT_FLUSH
+
+        if amounts[:1] == [4]:
+            return cls.FOUR_OF_A_KIND
+
+        if amounts[:2] == [3, 2]:
+            return cls.FULL_HOUSE
+
+        if is_flush:
+            return cls.FLUSH
+
+        if is_straight:
+            return cls.STRAIGHT
+
+        if amounts == [3, 1, 1]:
+            return cls.TREE_OF_A_KIND
+
+        if amounts.count(2) == 2:
+            return cls.TWO_PAIR
+
+        if amounts.count(2) == 1:
+            return cls.ONE_PAIR
+
+        if amounts.count(1) == 5:
+            return cls.HIGH_CARD
+
+        return None
+
+    @classmethod
+    def classify(cls, hand):
+        return cls._get_value_by_profile(cls._get_hand_profile(hand))
 
     @classmethod
     def is_royal_flush(cls, hand):
-        return (hand.sorted_cards[0].numeric_value == 10 and
-                cls.is_straight_flush(hand))
+        amounts, is_flush, is_straight, lowest = cls._get_hand_profile(hand)
+        return is_flush and is_straight and lowest == 10
 
     @classmethod
     def is_straight_flush(cls, hand):
-        return cls.is_flush(hand) and cls.is_straight(hand)
+        amounts, is_flush, is_straight, lowest = cls._get_hand_profile(hand)
+        return is_flush and is_straight
 
     @classmethod
     def is_four_of_a_kind(cls, hand):
-        if 4 in cls._get_amount_of_a_kind(hand):
-            return True
-
-        return False
+        return 4 in cls._get_hand_profile(hand)[0]
 
     @classmethod
     def is_full_house(cls, hand):
-        return all(x in cls._get_amount_of_a_kind(hand) for x in [2, 3])
+        amounts = cls._get_hand_profile(hand)[0]
+        return 3 in amounts and 2 in amounts
 
     @classmethod
     def is_flush(cls, hand):
-        first_card = hand.cards[0]
-        suits = [first_card.suit]
-
-        for card in hand.cards[1:]:
-            if card.suit in suits:
-                suits.append(card.suit)
-
-        if len(suits) == hand.MAX_CARDS:
-            return True
-
-        return False
+        return cls._get_hand_profile(hand)[1]
 
     @classmethod
     def is_straight(cls, hand):
-        cards = hand.sorted_cards
-        previous_card = cards[0]
-
-        for card in cards[1:]:
-            if not card.numeric_value == previous_card.numeric_value + 1:
-                return False
-            previous_card = card
-
-        return True
+        return cls._get_hand_profile(hand)[2]
 
     @classmethod
     def is_tree_of_a_kind(cls, hand):
-        amount_of_a_kind = cls._get_amount_of_a_kind(hand)
-        if amount_of_a_kind.count(3) == 1 and amount_of_a_kind.count(1) == 2:
-            return True
-
-        return False
+        amounts = cls._get_hand_profile(hand)[0]
+        return amounts.count(3) == 1 and amounts.count(1) == 2
 
     @classmethod
     def is_two_pair(cls, hand):
-        if cls._get_amount_of_a_kind(hand).count(2) == 2:
-            return True
-
-        return False
+        return cls._get_hand_profile(hand)[0].count(2) == 2
 
     @classmethod
     def is_one_pair(cls, hand):
-        if cls._get_amount_of_a_kind(hand).count(2) == 1:
-            return True
-
-        return False
+        return cls._get_hand_profile(hand)[0].count(2) == 1
 
     @classmethod
     def is_high_card(cls, hand):
-        if cls._get_amount_of_a_kind(hand).count(1) == 5:
-            return True
-
-        return False
+        return cls._get_hand_profile(hand)[0].count(1) == 5
 
     @classmethod
-    def _get_hand_is_methods(cls):
-        return [
-            cls.is_royal_flush, cls.is_straight_flush,
-            cls.is_four_of_a_kind, cls.is_full_house,
-            cls.is_flush, cls.is_straight,
-            cls.is_tree_of_a_kind, cls.is_two_pair,
-            cls.is_one_pair, cls.is_high_card
-        ]
+    def get_tie_break_key(cls, hand):
+        # The numeric value in the high bits followed by one nibble per rank
+        # in tie break order: ranks held more times first and higher ranks
+        # first among them, with the ace of a wheel counted as 1. Keys of
+        # hands in the same category compare like the untie rules.
+        if not hand.has_correct_amount_of_cards():
+            raise ValueError('5 cards required %s given' %
+                             hand.amount_of_cards())
+
+        cards_dict = cls._get_cards_dict(hand)
+        numeric_value = hand.numeric_value
+        if (numeric_value in (cls.STRAIGHT, cls.STRAIGHT_FLUSH) and
+                14 in cards_dict and 2 in cards_dict):
+            cards_dict[1] = cards_dict.pop(14)
+
+        ranks = sorted(cards_dict, key=lambda rank: (cards_dict[rank], rank),
+                       reverse=True)
+        key = numeric_value
+        for rank in ranks:
+            key = key << 4 | rank
+        return key << 4 * (hand.MAX_CARDS - len(ranks))
 
     @classmethod
-    def _get_kind_by_amount(cls, hand):
-        hand_dict = cls._get_cards_dict(hand)
-        return {v: k for k, v in hand_dict.iteritems()}
+    def cmp_tie_break_keys(cls, hand, other_hand):
+        key, other_key = hand.tie_break_key, other_hand.tie_break_key
+        return (key > other_key) - (key < other_key)
 
     @classmethod
     def untie_royal_flush(cls, hand, other_hand):
-        return cmp(cls.ROYAL_FLUSH, cls.ROYAL_FLUSH)
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def untie_straight_flush(cls, hand, other_hand):
-        return cls.untie_straight(hand, other_hand)
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def untie_four_of_a_kind(cls, hand, other_hand):
-        hand_four_of_kind = cls._get_kind_by_amount(hand)
-        other_hand_four_of_kind = cls._get_kind_by_amount(other_hand)
-
-        if hand_four_of_kind[4] == other_hand_four_of_kind[4]:
-            return cmp(hand_four_of_kind[1], other_hand_four_of_kind[1])
-
-        return cmp(hand_four_of_kind[4], other_hand_four_of_kind[4])
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def untie_full_house(cls, hand, other_hand):
-        hand_four_of_kind = cls._get_kind_by_amount(hand)
-        other_hand_four_of_kind = cls._get_kind_by_amount(other_hand)
-
-        if hand_four_of_kind[3] == other_hand_four_of_kind[3]:
-            return cmp(hand_four_of_kind[2], other_hand_four_of_kind[2])
-
-        return cmp(hand_four_of_kind[3], other_hand_four_of_kind[3])
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def untie_flush(cls, hand, other_hand):
-        return cls.untie_high_card(hand, other_hand)
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def untie_straight(cls, hand, other_hand):
-        hand_higher_card = hand.sorted_cards[-1]
-        other_hand_higher_card = other_hand.sorted_cards[-1]
-        return cmp(hand_higher_card.numeric_value,
-                   other_hand_higher_card.numeric_value)
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def get_kicker(cls, hand, of_a_kinds):
@@ -299,99 +706,1636 @@ class PokerRules(object):
 
     @classmethod
     def untie_tree_of_a_kind(cls, hand, other_hand):
-        hand_four_of_kind = cls._get_kind_by_amount(hand)
-        other_hand_four_of_kind = cls._get_kind_by_amount(other_hand)
-
-        if hand_four_of_kind[3] == other_hand_four_of_kind[3]:
-            return cls.untie_high_card(hand, other_hand)
-
-        return cmp(hand_four_of_kind[3], other_hand_four_of_kind[3])
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
     @classmethod
     def get_hand_pairs(cls, hand):
         cards_dict = cls._get_cards_dict(hand)
-        return [kind for kind, amount in cards_dict.iteritems() if amount == 2]
+        return [kind for kind, amount in cards_dict.items() if amount == 2]
 
     @classmethod
     def untie_two_pair(cls, hand, other_hand):
-        hand_pairs = sorted(cls.get_hand_pairs(hand))
-        other_hand_pairs = sorted(cls.get_hand_pairs(other_hand))
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
-        if hand_pairs[-1] == other_hand_pairs[-1]:
+    @classmethod
+    def untie_one_pair(cls, hand, other_hand):
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
-            if hand_pairs[0] == other_hand_pairs[0]:
+    @classmethod
+    def untie_high_card(cls, hand, other_hand):
+        return cls.cmp_tie_break_keys(hand, other_hand)
 
-                hand_kicker = cls.get_kicker(hand, hand_pairs)
-                other_hand_kicker = cls.get_kicker(other_hand, other_hand_pairs)
+    @classmethod
+    def cmp_hands(cls, hand, other_hand, hand_value=None):
+        strength = cls.get_strength_by_hand(hand)
+        other_strength = cls.get_strength_by_hand(other_hand)
+        return (strength > other_strength) - (strength < other_strength)
 
-                return cmp(hand_kicker, other_hand_kicker)
+    @classmethod
+    def get_strength_by_ints(cls, card_ints):
+        flushes, unique5, products = LookupTables.get()
+        c1, c2, c3, c4, c5 = card_ints
+        mask = (c1 | c2 | c3 | c4 | c5) >> 16
 
-            return cmp(hand_pairs[0], other_hand_pairs[0])
+        if c1 & c2 & c3 & c4 & c5 & 0xF000 and flushes[mask]:
+            return flushes[mask]
 
-        return cmp(hand_pairs[-1], other_hand_pairs[-1])
+        if unique5[mask]:
+            return unique5[mask]
+
+        product = ((c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) *
+                   (c4 & 0xFF) * (c5 & 0xFF))
+        return products.get(product, 0)
 
     @classmethod
-    def untie_one_pair(cls, hand, other_hand):
-        hand_pairs = sorted(cls.get_hand_pairs(hand))
-        other_hand_pairs = sorted(cls.get_hand_pairs(other_hand))
+    def get_strength_by_hand(cls, hand):
+        return hand.strength
 
-        if hand_pairs[0] == other_hand_pairs[0]:
-            return cls.untie_high_card(hand, other_hand)
+    @classmethod
+    def _get_best_flush(cls, suited_ints):
+        mask = 0
+        for card_int in suited_ints:
+            mask |= card_int >> 16
 
-        return cmp(hand_pairs[-1], other_hand_pairs[-1])
+        cards = sorted(suited_ints, reverse=True)
+        for straight in cls.RANK_STRAIGHTS:
+            if all(mask & (1 << rank) for rank in straight):
+                return [
+                    [c for c in cards if (c >> 8) & 0xF == rank][0]
+                    for rank in straight
+                ]
+
+        return cards[:5]
 
     @classmethod
-    def untie_high_card(cls, hand, other_hand):
-        hand_cards = hand.sorted_cards[::-1]
-        other_hand_cards = other_hand.sorted_cards[::-1]
+    def _get_best_of_a_kind(cls, by_rank):
+        ranks = [rank for rank in range(12, -1, -1) if by_rank[rank]]
+        quads = [rank for rank in ranks if len(by_rank[rank]) >= 4]
+        trips = [rank for rank in ranks if len(by_rank[rank]) >= 3]
+        pairs = [rank for rank in ranks if len(by_rank[rank]) >= 2]
+
+        def kickers(used, amount):
+            return [by_rank[rank][0]
+                    for rank in ranks if rank not in used][:amount]
+
+        if quads:
+            return by_rank[quads[0]][:4] + kickers(quads[:1], 1)
+
+        if trips and len(pairs) >= 2:
+            pair = [rank for rank in pairs if rank != trips[0]][0]
+            return by_rank[trips[0]][:3] + by_rank[pair][:2]
+
+        for straight in cls.RANK_STRAIGHTS:
+            if all(by_rank[rank] for rank in straight):
+                return [by_rank[rank][0] for rank in straight]
 
-        for index, hand_card in enumerate(hand_cards):
-            other_hand_card = other_hand_cards[index]
-            if hand_card != other_hand_card:
+        if trips:
+            return by_rank[trips[0]][:3] + kickers(trips[:1], 2)
 
-                return cmp(hand_card.numeric_value,
-                           other_hand_card.numeric_value)
+        if len(pairs) >= 2:
+            return (by_rank[pairs[0]][:2] + by_rank[pairs[1]][:2] +
+                    kickers(pairs[:2], 1))
 
-        return cmp(hand.sorted_cards[-1], other_hand.sorted_cards[-1])
+        if pairs:
+            return by_rank[pairs[0]][:2] + kickers(pairs[:1], 3)
+
+        return kickers([], 5)
 
     @classmethod
-    def _hand_untie_methods(cls):
-        return {
-            cls.ROYAL_FLUSH: cls.untie_royal_flush,
-            cls.STRAIGHT_FLUSH: cls.untie_straight_flush,
-            cls.FOUR_OF_A_KIND: cls.untie_four_of_a_kind,
-            cls.FULL_HOUSE: cls.untie_full_house,
-            cls.FLUSH: cls.untie_flush,
-            cls.STRAIGHT: cls.untie_straight,
-            cls.TREE_OF_A_KIND: cls.untie_tree_of_a_kind,
-            cls.TWO_PAIR: cls.untie_two_pair,
-            cls.ONE_PAIR: cls.untie_one_pair,
-            cls.HIGH_CARD: cls.untie_high_card
-        }
+    def get_best_by_ints(cls, card_ints):
+        if not 5 <= len(card_ints) <= 7:
+            raise ValueError('5 to 7 cards required %s given' % len(card_ints))
+
+        by_rank = [[] for _ in range(13)]
+        by_suit = {}
+
+        for card_int in card_ints:
+            by_rank[(card_int >> 8) & 0xF].append(card_int)
+            by_suit.setdefault(card_int & 0xF000, []).append(card_int)
+
+        candidates = [cls._get_best_of_a_kind(by_rank)]
+        for suited_ints in by_suit.values():
+            if len(suited_ints) >= 5:
+                candidates.append(cls._get_best_flush(suited_ints))
+
+        return max(
+            (cls.get_strength_by_ints(five), five) for five in candidates
+        )
+
+    @classmethod
+    def _get_cards_state(cls, card_ints):
+        # The product of the rank primes and the cards of each suit ORed
+        # together, indexed by the suit bit (1 for spades up to 8 for clubs).
+        product = 1
+        masks = [0] * 9
+
+        for card_int in card_ints:
+            product *= card_int & 0xFF
+            masks[(card_int >> 12) & 0xF] |= card_int
+
+        return product, masks
+
+    @classmethod
+    def _get_strength_by_states(cls, state, other_state):
+        flushes, products = LookupTables.get_seven_card()
+        product, masks = state
+        other_product, other_masks = other_state
+
+        strength = products.get(product * other_product, 0)
+        for suit in (1, 2, 4, 8):
+            flush = flushes[(masks[suit] | other_masks[suit]) >> 16]
+            if flush > strength:
+                strength = flush
+
+        return strength
+
+    @classmethod
+    def get_best_strength_by_ints(cls, card_ints):
+        if not 5 <= len(card_ints) <= 7:
+            raise ValueError('5 to 7 cards required %s given' % len(card_ints))
+
+        return cls._get_strength_by_states(
+            cls._get_cards_state(card_ints), cls._get_cards_state(())
+        )
+
+    @classmethod
+    def get_numeric_value_by_strength(cls, strength):
+        return bisect.bisect_right(LookupTables.CATEGORY_FLOORS, strength)
+
+    @classmethod
+    def evaluate_batch(cls, cards):
+        if numpy is None:
+            raise ImportError('numpy is required for evaluate_batch')
+
+        cards = numpy.asarray(cards, dtype=numpy.int64)
+        if cards.ndim != 2 or cards.shape[1] != 5:
+            raise ValueError('Array of shape (N, 5) required %s given' %
+                             (cards.shape,))
+
+        flushes, unique5, products, product_strengths = (
+            LookupTables.get_arrays()
+        )
+        mask = numpy.bitwise_or.reduce(cards, axis=1) >> 16
+        suited = numpy.bitwise_and.reduce(cards, axis=1) & 0xF000
+
+        strengths = numpy.where(suited != 0, flushes[mask], 0)
+        strengths = numpy.where(strengths == 0, unique5[mask], strengths)
+
+        missing = numpy.flatnonzero(strengths == 0)
+        if len(missing):
+            product = numpy.prod(cards[missing] & 0xFF, axis=1)
+            index = numpy.searchsorted(products, product)
+            index = numpy.minimum(index, len(products) - 1)
+            strengths[missing] = numpy.where(
+                products[index] == product, product_strengths[index], 0
+            )
+
+        strengths = strengths.astype(numpy.int32)
+        categories = numpy.searchsorted(
+            LookupTables.CATEGORY_FLOORS, strengths, side='right'
+        ).astype(numpy.int32)
+
+        return categories, strengths
+
+    @classmethod
+    def best_hand(cls, cards):
+        card_ints = [card.to_int() for card in cards]
+        strength, five = cls.get_best_by_ints(card_ints)
+        return Hand.from_ints(five), strength
+
+    # Starting hands fall in 169 classes: pairs on the diagonal of a 13x13
+    # grid of ranks, suited hands above it and offsuit hands below it.
+    HOLE_CLASSES = 169
+
+    RANK_NAMES = '23456789TJQKA'
+
+    _canonical_offsets = None
+
+    @classmethod
+    def _get_canonical_offsets(cls):
+        # Every way of splitting up to 7 cards among the suits, most cards
+        # first, with the first index of its classes and how many there are.
+        if cls._canonical_offsets is None:
+            offsets = {}
+            for amount in range(8):
+                start = 0
+                for counts in sorted(
+                    tuple(reversed(counts)) for counts in
+                    itertools.combinations_with_replacement(range(amount + 1),
+                                                            4)
+                    if sum(counts) == amount
+                ):
+                    size = 1
+                    for count in set(counts):
+                        repeats = counts.count(count)
+                        size *= math.comb(math.comb(13, count) + repeats - 1,
+                                          repeats)
+                    offsets[counts] = (start, size)
+                    start += size
+                offsets[amount] = start
+            cls._canonical_offsets = offsets
+        return cls._canonical_offsets
+
+    @classmethod
+    def get_canonical_index_count(cls, amount):
+        if not 0 <= amount <= 7:
+            raise ValueError('Up to 7 cards required %s given' % amount)
+        return cls._get_canonical_offsets()[amount]
+
+    @classmethod
+    def get_canonical_index_by_ints(cls, card_ints):
+        # Hands that only differ by a permutation of suits hold the same
+        # ranks per suit, so each class is a multiset of rank masks. They
+        # are numbered densely, from 0 up to the amount of classes for that
+        # many cards - 1, first by the amount of cards per suit and then by
+        # the colex ranks of the masks holding as many cards.
+        if len(set(card_ints)) != len(card_ints):
+            raise ValueError('Repeated cards %s' % list(card_ints))
+        if len(card_ints) > 7:
+            raise ValueError('Up to 7 cards required %s given' %
+                             len(card_ints))
+
+        masks = dict((suit, 0) for suit in (0x1000, 0x2000, 0x4000, 0x8000))
+        for card_int in card_ints:
+            masks[card_int & 0xF000] |= card_int >> 16
+
+        ranks = collections.defaultdict(list)
+        counts = []
+        for mask in masks.values():
+            rank = count = 0
+            for bit in range(13):
+                if mask >> bit & 1:
+                    count += 1
+                    rank += math.comb(bit, count)
+            ranks[count].append(rank)
+            counts.append(count)
+
+        start, _ = cls._get_canonical_offsets()[
+            tuple(sorted(counts, reverse=True))
+        ]
+        index = 0
+        for count in sorted(ranks, reverse=True):
+            repeats = len(ranks[count])
+            index = index * math.comb(math.comb(13, count) + repeats - 1,
+                                      repeats) + sum(
+                math.comb(rank + position, position + 1)
+                for position, rank in enumerate(sorted(ranks[count]))
+            )
+        return start + index
+
+    @classmethod
+    def hole_class(cls, cards):
+        if len(cards) != 2 or cards[0].to_int() == cards[1].to_int():
+            raise ValueError('2 different cards required %s given' %
+                             list(cards))
+
+        high, low = sorted(
+            (card.numeric_value - 2 for card in cards), reverse=True
+        )
+        if high == low or cards[0].suit == cards[1].suit:
+            return high * 13 + low
+        return low * 13 + high
+
+    @classmethod
+    def get_hole_class_combos(cls, hole_class):
+        # The card ints of every combination of hole cards in the class,
+        # 6 for pairs, 4 for suited hands and 12 for offsuit ones.
+        if not 0 <= hole_class < cls.HOLE_CLASSES:
+            raise ValueError('Invalid hole class %s' % hole_class)
+
+        first, second = divmod(hole_class, 13)
+        suits = (0x8000, 0x4000, 0x2000, 0x1000)
+        if first == second:
+            suit_pairs = itertools.combinations(suits, 2)
+        elif first > second:
+            suit_pairs = [(suit, suit) for suit in suits]
+        else:
+            suit_pairs = [
+                (suit, other_suit) for suit in suits for other_suit in suits
+                if suit != other_suit
+            ]
+
+        return [
+            tuple((1 << (16 + rank)) | suit | (rank << 8) | Card.PRIMES[rank]
+                  for rank, suit in zip((first, second), suit_pair))
+            for suit_pair in suit_pairs
+        ]
+
+    @classmethod
+    def preflop_equity(cls, hole_cards, other_hole_cards):
+        return PreflopEquity.get_equity(cls.hole_class(hole_cards),
+                                        cls.hole_class(other_hole_cards))
+
+    @classmethod
+    def get_hole_class_name(cls, hole_class):
+        if not 0 <= hole_class < cls.HOLE_CLASSES:
+            raise ValueError('Invalid hole class %s' % hole_class)
+
+        first, second = divmod(hole_class, 13)
+        if first == second:
+            return cls.RANK_NAMES[first] * 2
+        if first > second:
+            return cls.RANK_NAMES[first] + cls.RANK_NAMES[second] + 's'
+        return cls.RANK_NAMES[second] + cls.RANK_NAMES[first] + 'o'
+
+    @classmethod
+    def get_hole_class_by_name(cls, name):
+        high, low = name[:1], name[1:2]
+        if high not in Card.VALUES or low not in Card.VALUES:
+            raise ValueError('Invalid hole class %s' % name)
+
+        high, low = Card.VALUES[high] - 2, Card.VALUES[low] - 2
+        if high == low and name[2:] == '':
+            return high * 13 + low
+        if high > low and name[2:] == 's':
+            return high * 13 + low
+        if high > low and name[2:] == 'o':
+            return low * 13 + high
+        raise ValueError('Invalid hole class %s' % name)
+
+    EQUITY_CHUNK_SIZE = 1000
+
+    @classmethod
+    def _get_deck_ints(cls, dead_ints=()):
+        dead_ints = set(dead_ints)
+        return sorted(
+            card_int for card_int in (
+                Card(value, suit).to_int()
+                for value in Card.VALUES for suit in Card.SUITS
+            )
+            if card_int not in dead_ints
+        )
+
+    @classmethod
+    def _get_dealt_ints(cls, hole_cards_per_player, board):
+        hole_ints = [
+            tuple(card.to_int() for card in hole_cards)
+            for hole_cards in hole_cards_per_player
+        ]
+        board_ints = tuple(card.to_int() for card in board)
+        dealt = [card_int for cards in hole_ints for card_int in cards]
+        dealt.extend(board_ints)
+
+        if len(hole_ints) < 2:
+            raise ValueError('2 or more players required %s given' %
+                             len(hole_ints))
+        if len(board_ints) > 5:
+            raise ValueError('Up to 5 board cards required %s given' %
+                             len(board_ints))
+        for cards in hole_ints:
+            if len(cards) != 2:
+                raise ValueError('2 hole cards required %s given' %
+                                 len(cards))
+        if len(set(dealt)) != len(dealt):
+            raise ValueError('Repeated cards %s' % (
+                list(hole_cards_per_player) + [list(board)]
+            ))
+
+        return hole_ints, board_ints
 
     @classmethod
-    def cmp_hands(cls, hand, other_hand, hand_value):
-        untie_method = cls._hand_untie_methods().get(hand_value)
-        return untie_method(hand, other_hand)
+    def _get_showdown_results(cls, hole_states, board_ints, results,
+                              weight=1):
+        board_state = cls._get_cards_state(board_ints)
+        strengths = [
+            cls._get_strength_by_states(hole_state, board_state)
+            for hole_state in hole_states
+        ]
+        best = max(strengths)
+        winners = strengths.count(best)
+
+        for player, strength in enumerate(strengths):
+            if strength != best:
+                results[player][2] += weight
+            elif winners == 1:
+                results[player][0] += weight
+            else:
+                results[player][1] += weight
+                results[player][3] += weight / winners
+
+    @classmethod
+    def _get_equity_results(cls, totals, boards):
+        return [
+            {
+                'win': win,
+                'tie': tie,
+                'loss': loss,
+                'equity': (win + split) / boards,
+            }
+            for win, tie, loss, split in totals
+        ]
 
     @classmethod
-    def _get_value_by_hand(cls, hand, hand_methods=[], result=False, count=10):
+    def _simulate_equity(cls, hole_ints, board_ints, iterations, seed):
+        deck = Deck(seed=seed)
+        deck.remove_ints(
+            [card_int for cards in hole_ints for card_int in cards] +
+            list(board_ints)
+        )
+        missing = 5 - len(board_ints)
+        hole_states = [cls._get_cards_state(cards) for cards in hole_ints]
+        results = [[0, 0, 0, 0.0] for _ in hole_ints]
+
+        for _ in range(iterations):
+            deck.shuffle()
+            cls._get_showdown_results(
+                hole_states, board_ints + tuple(deck.deal_ints(missing)),
+                results
+            )
 
-        if not hand_methods:
-            return None
+        return results
+
+    @classmethod
+    def equity(cls, hole_cards_per_player, board=(), iterations=10000,
+               workers=1, seed=None):
+        hole_ints, board_ints = cls._get_dealt_ints(
+            hole_cards_per_player, board
+        )
+        if iterations < 1:
+            raise ValueError('Invalid amount of iterations %s' % iterations)
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+
+        # Chunks are seeded on their own, so the results only depend on the
+        # seed and never on how many workers ran them.
+        tasks = [
+            (hole_ints, board_ints,
+             min(cls.EQUITY_CHUNK_SIZE, iterations - start),
+             seed * 1000003 + start)
+            for start in range(0, iterations, cls.EQUITY_CHUNK_SIZE)
+        ]
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_simulate_equity, tasks))
+        else:
+            chunks = [_simulate_equity(task) for task in tasks]
+
+        totals = [[0, 0, 0, 0.0] for _ in hole_ints]
+        for chunk in chunks:
+            for player, results in enumerate(chunk):
+                for index, result in enumerate(results):
+                    totals[player][index] += result
+
+        return cls._get_equity_results(totals, iterations)
+
+    @classmethod
+    def _get_range_results(cls, combos, other_combos, boards):
+        # Every board is evaluated once for all the combos of both ranges.
+        # Each combo is then compared against the whole other range at once
+        # through the cumulative weights of its sorted strengths, only going
+        # through the few combos it blocks one by one.
+        states = [cls._get_cards_state(cards) for cards, _ in combos]
+        other_states = [
+            cls._get_cards_state(cards) for cards, _ in other_combos
+        ]
+        blocked = [
+            [
+                other_index
+                for other_index, (other_cards, _) in enumerate(other_combos)
+                if set(cards).intersection(other_cards)
+            ]
+            for cards, _ in combos
+        ]
+        win = tie = loss = 0.0
+
+        for board_ints in boards:
+            board_state = cls._get_cards_state(board_ints)
+            dealt = set(board_ints)
+
+            other_strengths = [
+                None if dealt.intersection(cards) else
+                cls._get_strength_by_states(state, board_state)
+                for (cards, _), state in zip(other_combos, other_states)
+            ]
+            ordered = sorted(
+                (strength, weight)
+                for strength, (_, weight) in zip(other_strengths,
+                                                 other_combos)
+                if strength is not None
+            )
+            strengths = [strength for strength, _ in ordered]
+            cumulative = [0.0]
+            for _, weight in ordered:
+                cumulative.append(cumulative[-1] + weight)
+
+            for index, (cards, weight) in enumerate(combos):
+                if dealt.intersection(cards):
+                    continue
+
+                strength = cls._get_strength_by_states(states[index],
+                                                       board_state)
+                lower = bisect.bisect_left(strengths, strength)
+                upper = bisect.bisect_right(strengths, strength)
+                below = cumulative[lower]
+                equal = cumulative[upper] - below
+                total = cumulative[-1]
+
+                for other_index in blocked[index]:
+                    other_strength = other_strengths[other_index]
+                    if other_strength is None:
+                        continue
+                    other_weight = other_combos[other_index][1]
+                    if other_strength < strength:
+                        below -= other_weight
+                    elif other_strength == strength:
+                        equal -= other_weight
+                    total -= other_weight
+
+                win += weight * below
+                tie += weight * equal
+                loss += weight * (total - below - equal)
+
+        return win, tie, loss
+
+    @classmethod
+    def range_equity(cls, hand_range, other_range, board=(),
+                     iterations=1000, seed=None):
+        # Goes through every board when at most 2 cards are missing and
+        # samples `iterations` boards otherwise.
+        board_ints = tuple(card.to_int() for card in board)
+        if len(board_ints) > 5:
+            raise ValueError('Up to 5 board cards required %s given' %
+                             len(board_ints))
+        if len(set(board_ints)) != len(board_ints):
+            raise ValueError('Repeated cards %s' % list(board))
+
+        combos = hand_range.get_combos(board)
+        other_combos = other_range.get_combos(board)
+        deck_ints = cls._get_deck_ints(board_ints)
+        missing = 5 - len(board_ints)
+
+        if missing <= 2:
+            boards = (
+                board_ints + cards
+                for cards in itertools.combinations(deck_ints, missing)
+            )
+        else:
+            if iterations < 1:
+                raise ValueError('Invalid amount of iterations %s' %
+                                 iterations)
+            if seed is None:
+                seed = random.SystemRandom().randrange(2 ** 32)
+            rng = random.Random(seed)
+            boards = (
+                board_ints + tuple(rng.sample(deck_ints, missing))
+                for _ in range(iterations)
+            )
+
+        win, tie, loss = cls._get_range_results(combos, other_combos, boards)
+        total = win + tie + loss
+        if not total:
+            raise ValueError('No possible matchups between the ranges')
+
+        return [
+            {'win': win, 'tie': tie, 'loss': loss,
+             'equity': (win + tie / 2) / total},
+            {'win': loss, 'tie': tie, 'loss': win,
+             'equity': (loss + tie / 2) / total},
+        ]
+
+    @classmethod
+    def _get_interchangeable_suits(cls, hole_ints, board_ints):
+        # Groups the suits that can be swapped with each other without
+        # changing any player's hole cards or the board.
+        known = [frozenset(cards) for cards in hole_ints]
+        known.append(frozenset(board_ints))
+        groups = [[suit] for suit in (0x8000, 0x4000, 0x2000, 0x1000)]
+
+        def swap(card_int, suit, other_suit):
+            if card_int & suit:
+                return (card_int ^ suit) | other_suit
+            if card_int & other_suit:
+                return (card_int ^ other_suit) | suit
+            return card_int
+
+        for group in list(groups):
+            for other_group in groups:
+                if other_group is group or not other_group:
+                    continue
+                suit, other_suit = group[0], other_group[0]
+                if all(frozenset(swap(card_int, suit, other_suit)
+                                 for card_int in cards) == cards
+                       for cards in known):
+                    other_group.extend(group)
+                    del group[:]
+                    break
+
+        return [group for group in groups if group]
+
+    @classmethod
+    def _iter_suits_boards(cls, suits, ranks, amount):
+        # Yields one board of each isomorphism class of `amount` cards
+        # spread over `suits`, which all have the same `ranks` available,
+        # along with how many boards are in that class.
+        for sizes in itertools.combinations_with_replacement(
+                range(amount + 1), len(suits)):
+            if sum(sizes) != amount:
+                continue
+
+            choices = [
+                itertools.combinations_with_replacement(
+                    list(itertools.combinations(ranks, size)),
+                    sizes.count(size)
+                )
+                for size in sorted(set(sizes))
+            ]
+            for chosen in itertools.product(*choices):
+                subsets = [subset for group in chosen for subset in group]
+                weight = math.factorial(len(suits))
+                for subset in set(subsets):
+                    weight //= math.factorial(subsets.count(subset))
+
+                cards = [
+                    (1 << (16 + rank)) | suit | (rank << 8) | Card.PRIMES[rank]
+                    for suit, subset in zip(suits, subsets)
+                    for rank in subset
+                ]
+                yield cards, weight
+
+    @classmethod
+    def _iter_isomorphic_boards(cls, hole_ints, board_ints):
+        dealt = set(board_ints)
+        for cards in hole_ints:
+            dealt.update(cards)
+
+        missing = 5 - len(board_ints)
+        per_group = []
+        for suits in cls._get_interchangeable_suits(hole_ints, board_ints):
+            ranks = [
+                rank for rank in range(13)
+                if not any((card_int >> 8) & 0xF == rank and
+                           card_int & suits[0] for card_int in dealt)
+            ]
+            boards_by_amount = [[] for _ in range(missing + 1)]
+            for amount in range(missing + 1):
+                boards_by_amount[amount] = list(
+                    cls._iter_suits_boards(suits, ranks, amount)
+                )
+            per_group.append(boards_by_amount)
+
+        def combine(index, amount):
+            if index == len(per_group) - 1:
+                for cards, weight in per_group[index][amount]:
+                    yield cards, weight
+                return
+
+            for group_amount in range(amount + 1):
+                for cards, weight in per_group[index][group_amount]:
+                    for rest, rest_weight in combine(index + 1,
+                                                     amount - group_amount):
+                        yield cards + rest, weight * rest_weight
+
+        for cards, weight in combine(0, missing):
+            yield board_ints + tuple(cards), weight
+
+    @classmethod
+    def exact_equity(cls, hole_cards_per_player, board=()):
+        hole_ints, board_ints = cls._get_dealt_ints(
+            hole_cards_per_player, board
+        )
+        hole_states = [cls._get_cards_state(cards) for cards in hole_ints]
+        totals = [[0, 0, 0, 0.0] for _ in hole_ints]
+        boards = 0
+
+        for full_board, weight in cls._iter_isomorphic_boards(hole_ints,
+                                                              board_ints):
+            cls._get_showdown_results(hole_states, full_board, totals, weight)
+            boards += weight
+
+        return cls._get_equity_results(totals, boards)
+
+    @classmethod
+    def evaluate(cls, hand):
+        # Hands holding the same cards share an entry in the cache, whatever
+        # the order of their cards.
+        key = tuple(sorted(hand.to_ints()))
+        evaluation = cls.cache.get(key)
 
-        hand_method = hand_methods[0]
-        result = hand_method(hand)
+        if evaluation is None:
+            strength = 0
+            if len(key) == hand.MAX_CARDS:
+                strength = cls.get_strength_by_ints(key)
 
-        if result:
-            return count
+            evaluation = (cls.classify(hand), strength)
+            cls.cache.put(key, evaluation)
 
-        return cls._get_value_by_hand(hand, hand_methods[1:], result, count - 1)
+        return evaluation
 
     @classmethod
     def get_numeric_value_by_hand(cls, hand):
-        return cls._get_value_by_hand(hand, cls._get_hand_is_methods())
+        return hand.numeric_value
 
     @classmethod
     def get_value_by_hand(cls, hand):
         return cls.VALUES.get(cls.get_numeric_value_by_hand(hand))
+
+
+class Showdown(object):
+    def __init__(self, board=()):
+        self.board = list(board)
+        self.players = []
+        self._contributions = {}
+        self._cards = {}
+        self._folded = set()
+        self._strengths = None
+
+    def add_player(self, player, cards, contribution, folded=False):
+        if player in self._contributions:
+            raise ValueError('Repeated player %s' % player)
+        if contribution < 0:
+            raise ValueError('Invalid contribution %s' % contribution)
+
+        self.players.append(player)
+        self._contributions[player] = contribution
+        self._cards[player] = list(cards or [])
+        if folded:
+            self._folded.add(player)
+        self._strengths = None
+
+    def _get_strengths(self):
+        if self._strengths is None:
+            board_ints = [card.to_int() for card in self.board]
+            dealt = list(board_ints)
+            self._strengths = {}
+
+            for player in self.players:
+                if player in self._folded:
+                    continue
+
+                card_ints = [card.to_int() for card in self._cards[player]]
+                dealt.extend(card_ints)
+                if len(self.players) - len(self._folded) > 1:
+                    self._strengths[player] = (
+                        PokerRules.get_best_strength_by_ints(
+                            card_ints + board_ints
+                        )
+                    )
+                else:
+                    self._strengths[player] = 0
+
+            if len(set(dealt)) != len(dealt):
+                raise ValueError('Repeated cards in showdown')
+
+        return self._strengths
+
+    def rank(self):
+        strengths = self._get_strengths()
+        ranking = []
+
+        for player in sorted(strengths, key=strengths.get, reverse=True):
+            if ranking and strengths[ranking[-1][0]] == strengths[player]:
+                ranking[-1].append(player)
+            else:
+                ranking.append([player])
+
+        # Ties keep the order in which the players were added.
+        return [sorted(tied, key=self.players.index) for tied in ranking]
+
+    def pots(self):
+        strengths = self._get_strengths()
+        levels = sorted(set(self._contributions.values()) - set([0]))
+        pots = []
+        previous_level = 0
+
+        for level in levels:
+            amount = sum(
+                min(contribution, level) - min(contribution, previous_level)
+                for contribution in self._contributions.values()
+            )
+            eligible = [
+                player for player in self.players
+                if player in strengths and self._contributions[player] >= level
+            ]
+            previous_level = level
+
+            if pots and (not eligible or pots[-1]['players'] == eligible):
+                pots[-1]['amount'] += amount
+            elif eligible:
+                pots.append({'amount': amount, 'players': eligible})
+
+        for pot in pots:
+            best = max(strengths[player] for player in pot['players'])
+            pot['winners'] = [
+                player for player in pot['players']
+                if strengths[player] == best
+            ]
+
+        return pots
+
+    def resolve(self):
+        payouts = dict((player, 0) for player in self.players)
+
+        for pot in self.pots():
+            share, odd_chips = divmod(pot['amount'], len(pot['winners']))
+            for index, player in enumerate(pot['winners']):
+                payouts[player] += share + (1 if index < odd_chips else 0)
+
+        return payouts
+
+
+class Range(object):
+    # Expands range notation into weighted combos of hole cards. Items are
+    # separated by commas, like 'QQ+, AKs, ATo+, KTs-K7s, 88-55, AhKh' and
+    # take an optional frequency, as in 'AQo:0.5'. Later items override
+    # the weight of combos already in the range.
+    def __init__(self, range_string=''):
+        self.combos = collections.OrderedDict()
+        for item in range_string.split(','):
+            if item.strip():
+                self.add(item.strip())
+
+    def __len__(self):
+        return len(self.combos)
+
+    def add(self, item):
+        notation, _, weight = item.partition(':')
+        if weight:
+            try:
+                weight = float(weight)
+            except ValueError:
+                raise ValueError('Invalid weight in %s' % item)
+            if not 0 < weight <= 1:
+                raise ValueError('Invalid weight in %s' % item)
+        else:
+            weight = 1.0
+
+        for cards in self._get_notation_combos(notation):
+            self.combos[tuple(sorted(cards))] = weight
+
+    def get_combos(self, dead_cards=()):
+        # Combos holding any of the dead cards are left out.
+        dead_ints = set(card.to_int() for card in dead_cards)
+        return [
+            (cards, weight) for cards, weight in self.combos.items()
+            if not dead_ints.intersection(cards)
+        ]
+
+    @classmethod
+    def _get_notation_combos(cls, notation):
+        if (len(notation) == 4 and notation[1].upper() in Card.SUITS and
+                notation[3].upper() in Card.SUITS):
+            cards = [
+                Card.parse_from_string(notation[start] +
+                                       notation[start + 1].upper())
+                for start in (0, 2)
+            ]
+            if cards[0] is cards[1]:
+                raise ValueError('Invalid combo %s' % notation)
+            return [tuple(card.to_int() for card in cards)]
+
+        if '-' in notation:
+            first, _, last = notation.partition('-')
+            high, low, kinds = cls._parse_hole_classes(first, notation)
+            other_high, other_low, other_kinds = cls._parse_hole_classes(
+                last, notation
+            )
+            if kinds != other_kinds:
+                raise ValueError('Invalid range %s' % notation)
+
+            if high == low:
+                ranks = [
+                    (rank, rank) for rank in
+                    range(min(low, other_low), max(low, other_low) + 1)
+                ]
+            elif high == other_high:
+                ranks = [
+                    (high, rank) for rank in
+                    range(min(low, other_low), max(low, other_low) + 1)
+                ]
+            else:
+                raise ValueError('Invalid range %s' % notation)
+        elif notation.endswith('+'):
+            high, low, kinds = cls._parse_hole_classes(notation[:-1],
+                                                       notation)
+            if high == low:
+                ranks = [(rank, rank) for rank in range(low, 13)]
+            else:
+                ranks = [(high, rank) for rank in range(low, high)]
+        else:
+            high, low, kinds = cls._parse_hole_classes(notation, notation)
+            ranks = [(high, low)]
+
+        return [
+            cards
+            for high, low in ranks for kind in kinds
+            for cards in PokerRules.get_hole_class_combos(
+                PokerRules.get_hole_class_by_name(
+                    PokerRules.RANK_NAMES[high] + PokerRules.RANK_NAMES[low] +
+                    kind
+                )
+            )
+        ]
+
+    @classmethod
+    def _parse_hole_classes(cls, notation, item):
+        # The ranks of a class such as 'QQ', 'AKs' or 'AK', the last one
+        # standing for both the suited and the offsuit combos.
+        if (len(notation) not in (2, 3) or notation[0] not in Card.VALUES or
+                notation[1] not in Card.VALUES):
+            raise ValueError('Invalid range %s' % item)
+
+        high = Card.VALUES[notation[0]] - 2
+        low = Card.VALUES[notation[1]] - 2
+        kinds = [notation[2:]] if notation[2:] else ['s', 'o']
+        if high == low and not notation[2:]:
+            kinds = ['']
+        elif high <= low or kinds[0] not in ('s', 'o'):
+            raise ValueError('Invalid range %s' % item)
+
+        return high, low, kinds
+
+
+class IncrementalEvaluator(object):
+    # Keeps the rank histogram, the ranks held in each suit and the product
+    # of the rank primes of up to 7 cards, so the best hand out of them is
+    # known in constant time after every card added or popped, without
+    # evaluating the cards from scratch on every street.
+    MAX_CARDS = 7
+
+    def __init__(self, cards=()):
+        self._flushes, self._products = LookupTables.get_seven_card()
+        self._rank_counts = [0] * 13
+        # How many ranks are held once, twice, three and four times.
+        self._kind_counts = [0] * 5
+        # Indexed by the suit bit, 1 for spades up to 8 for clubs.
+        self._suit_counts = [0] * 9
+        self._suit_masks = [0] * 9
+        self._product = 1
+        self._dealt = set()
+        # The card int, numeric value and strength after each card added.
+        self._stack = []
+
+        for card in cards:
+            self.add(card)
+
+    def __len__(self):
+        return len(self._stack)
+
+    @property
+    def cards(self):
+        return [Card.from_int(card_int) for card_int, _, _ in self._stack]
+
+    @property
+    def numeric_value(self):
+        return self._stack[-1][1] if self._stack else None
+
+    @property
+    def strength(self):
+        # Only hands of 5 cards or more have a strength.
+        return self._stack[-1][2] if self._stack else 0
+
+    def add(self, card):
+        self.add_int(card.to_int())
+
+    def add_int(self, card_int):
+        if len(self._stack) >= self.MAX_CARDS:
+            raise ValueError('Up to 7 cards required')
+        if card_int in self._dealt:
+            raise ValueError('Repeated card %s' % Card.from_int(card_int))
+
+        rank = (card_int >> 8) & 0xF
+        suit = (card_int >> 12) & 0xF
+        count = self._rank_counts[rank]
+
+        self._kind_counts[count] -= 1
+        self._kind_counts[count + 1] += 1
+        self._rank_counts[rank] = count + 1
+        self._suit_counts[suit] += 1
+        self._suit_masks[suit] |= card_int >> 16
+        self._product *= card_int & 0xFF
+        self._dealt.add(card_int)
+
+        self._stack.append((card_int,) + self._evaluate())
+
+    def pop(self):
+        return Card.from_int(self.pop_int())
+
+    def pop_int(self):
+        if not self._stack:
+            raise ValueError('No cards to pop')
+
+        card_int = self._stack.pop()[0]
+        rank = (card_int >> 8) & 0xF
+        suit = (card_int >> 12) & 0xF
+        count = self._rank_counts[rank]
+
+        self._kind_counts[count] -= 1
+        self._kind_counts[count - 1] += 1
+        self._rank_counts[rank] = count - 1
+        self._suit_counts[suit] -= 1
+        self._suit_masks[suit] &= ~(card_int >> 16)
+        self._product //= card_int & 0xFF
+        self._dealt.remove(card_int)
+
+        return card_int
+
+    def _evaluate(self):
+        if len(self._dealt) >= 5:
+            strength = self._products[self._product]
+            for suit in (1, 2, 4, 8):
+                if self._suit_counts[suit] >= 5:
+                    strength = max(strength,
+                                   self._flushes[self._suit_masks[suit]])
+            return (PokerRules.get_numeric_value_by_strength(strength),
+                    strength)
+
+        if self._kind_counts[4]:
+            return PokerRules.FOUR_OF_A_KIND, 0
+        if self._kind_counts[3]:
+            return PokerRules.TREE_OF_A_KIND, 0
+        if self._kind_counts[2] >= 2:
+            return PokerRules.TWO_PAIR, 0
+        if self._kind_counts[2]:
+            return PokerRules.ONE_PAIR, 0
+        return PokerRules.HIGH_CARD, 0
+
+
+class LookupTables(object):
+    # Every distinct 5-card hand gets a strength from 1 (7-5-4-3-2 offsuit)
+    # to MAX_STRENGTH (royal flush). Flushes are looked up by their rank
+    # bits, other hands with five distinct ranks by their rank bits as well
+    # and everything else by the product of the rank primes.
+    VERSION = 1
+    MAX_STRENGTH = 7462
+
+    # Lowest strength of each PokerRules numeric value, from HIGH_CARD up.
+    CATEGORY_FLOORS = [1, 1278, 4138, 4996, 5854, 5864, 7141, 7297, 7453, 7462]
+
+    PATH = os.environ.get(
+        'PYPOKER_TABLES',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                     'pypoker_tables.pickle')
+    )
+    SEVEN_CARD_PATH = os.path.splitext(PATH)[0] + '_7.pickle'
+
+    _tables = None
+    _seven_card_tables = None
+    _arrays = None
+
+    @classmethod
+    def get(cls):
+        if cls._tables is None:
+            cls._tables = cls.load(cls.PATH)
+        return cls._tables
+
+    @classmethod
+    def get_arrays(cls):
+        if cls._arrays is None:
+            flushes, unique5, products = cls.get()
+            keys = sorted(products)
+            cls._arrays = (
+                numpy.array(flushes, dtype=numpy.int64),
+                numpy.array(unique5, dtype=numpy.int64),
+                numpy.array(keys, dtype=numpy.int64),
+                numpy.array([products[key] for key in keys],
+                            dtype=numpy.int64),
+            )
+        return cls._arrays
+
+    @classmethod
+    def get_seven_card(cls):
+        if cls._seven_card_tables is None:
+            cls._seven_card_tables = cls.load(cls.SEVEN_CARD_PATH,
+                                              cls.generate_seven_card)
+        return cls._seven_card_tables
+
+    @classmethod
+    def load(cls, path, generate=None):
+        try:
+            with open(path, 'rb') as tables_file:
+                data = pickle.load(tables_file)
+            if data['version'] == cls.VERSION:
+                return data['tables']
+        except (IOError, OSError, EOFError, KeyError, pickle.PickleError):
+            pass
+
+        tables = (generate or cls.generate)()
+        cls.save(path, tables)
+        return tables
+
+    @classmethod
+    def save(cls, path, tables):
+        try:
+            with open(path, 'wb') as tables_file:
+                pickle.dump({'version': cls.VERSION, 'tables': tables},
+                            tables_file, 2)
+        except (IOError, OSError):
+            pass
+
+    @classmethod
+    def generate(cls):
+        ranks = range(12, -1, -1)
+        primes = Card.PRIMES
+        straights = [0b11111 << low for low in range(8, -1, -1)]
+        straights.append(0b1000000001111)
+        distinct = [
+            sum(1 << rank for rank in combination)
+            for combination in itertools.combinations(ranks, 5)
+        ]
+        distinct = [mask for mask in distinct if mask not in straights]
+
+        flushes = [0] * (straights[0] + 1)
+        unique5 = [0] * (straights[0] + 1)
+        products = {}
+
+        # Built from the best hand down to the worst one.
+        ordered = [(flushes, mask) for mask in straights]
+
+        for quads in ranks:
+            for kicker in ranks:
+                if kicker != quads:
+                    key = primes[quads] ** 4 * primes[kicker]
+                    ordered.append((products, key))
+
+        for trips in ranks:
+            for pair in ranks:
+                if pair != trips:
+                    key = primes[trips] ** 3 * primes[pair] ** 2
+                    ordered.append((products, key))
+
+        ordered.extend((flushes, mask) for mask in distinct)
+        ordered.extend((unique5, mask) for mask in straights)
+
+        for trips in ranks:
+            kickers = [rank for rank in ranks if rank != trips]
+            for k1, k2 in itertools.combinations(kickers, 2):
+                key = primes[trips] ** 3 * primes[k1] * primes[k2]
+                ordered.append((products, key))
+
+        for high_pair, low_pair in itertools.combinations(ranks, 2):
+            for kicker in ranks:
+                if kicker not in (high_pair, low_pair):
+                    key = (primes[high_pair] ** 2 * primes[low_pair] ** 2 *
+                           primes[kicker])
+                    ordered.append((products, key))
+
+        for pair in ranks:
+            kickers = [rank for rank in ranks if rank != pair]
+            for k1, k2, k3 in itertools.combinations(kickers, 3):
+                key = primes[pair] ** 2 * primes[k1] * primes[k2] * primes[k3]
+                ordered.append((products, key))
+
+        ordered.extend((unique5, mask) for mask in distinct)
+
+        for strength, (table, key) in enumerate(reversed(ordered), 1):
+            table[key] = strength
+
+        return flushes, unique5, products
+
+    @classmethod
+    def generate_seven_card(cls):
+        # The best flush for each set of 5 to 7 suited ranks and the best
+        # hand without a flush for each multiset of 5 to 7 ranks.
+        flushes, unique5, products = cls.get()
+        primes = Card.PRIMES
+
+        seven_card_flushes = [0] * (1 << 13)
+        for mask in range(1 << 13):
+            ranks = [rank for rank in range(12, -1, -1) if mask & (1 << rank)]
+            if len(ranks) < 5:
+                continue
+
+            for straight in PokerRules.RANK_STRAIGHTS:
+                if all(rank in ranks for rank in straight):
+                    ranks = straight
+                    break
+
+            seven_card_flushes[mask] = flushes[
+                sum(1 << rank for rank in ranks[:5])
+            ]
+
+        seven_card_products = {}
+        for amount in (5, 6, 7):
+            for ranks in itertools.combinations_with_replacement(range(13),
+                                                                 amount):
+                if any(ranks.count(rank) > 4 for rank in set(ranks)):
+                    continue
+
+                by_rank = [[] for _ in range(13)]
+                for rank in ranks:
+                    by_rank[rank].append(primes[rank] | (1 << (16 + rank)))
+
+                five = PokerRules._get_best_of_a_kind(by_rank)
+                mask = 0
+                product = 1
+                for card_int in five:
+                    mask |= card_int >> 16
+                    product *= card_int & 0xFF
+
+                key = 1
+                for rank in ranks:
+                    key *= primes[rank]
+                seven_card_products[key] = unique5[mask] or products[product]
+
+        return seven_card_flushes, seven_card_products
+
+
+def _simulate_equity(task):
+    return PokerRules._simulate_equity(*task)
+
+
+def _count_preflop_boards(boards):
+    return PreflopEquity._count_boards(boards)
+
+
+class HandArchive(object):
+    # A header followed by 5 bytes per hand, one card index per byte.
+    MAGIC = b'PYPKHND\x01'
+    HEADER_SIZE = len(MAGIC)
+    HAND_SIZE = 5
+
+    _card_ints = None
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files can not be mapped.
+            self._file.close()
+            raise ValueError('Invalid hand archive %s' % path)
+
+        if (self._mmap[:self.HEADER_SIZE] != self.MAGIC or
+                (len(self._mmap) - self.HEADER_SIZE) % self.HAND_SIZE):
+            self.close()
+            raise ValueError('Invalid hand archive %s' % path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return (len(self._mmap) - self.HEADER_SIZE) // self.HAND_SIZE
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Hand index out of range %s' % index)
+
+        start = self.HEADER_SIZE + index * self.HAND_SIZE
+        return Hand([
+            Card.from_index(card_index) for card_index
+            in bytearray(self._mmap[start:start + self.HAND_SIZE])
+        ])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @classmethod
+    def write(cls, path, hands):
+        amount = 0
+        with open(path, 'wb') as archive_file:
+            archive_file.write(cls.MAGIC)
+            for hand in hands:
+                if not hand.has_correct_amount_of_cards():
+                    raise ValueError('5 cards required %s given' %
+                                     hand.amount_of_cards())
+                archive_file.write(
+                    bytearray(card.to_index() for card in hand.cards)
+                )
+                amount += 1
+
+        return amount
+
+    def as_memoryview(self):
+        return memoryview(self._mmap)[self.HEADER_SIZE:]
+
+    def as_array(self):
+        if numpy is None:
+            raise ImportError('numpy is required for as_array')
+
+        return numpy.frombuffer(
+            self._mmap, dtype=numpy.uint8, offset=self.HEADER_SIZE
+        ).reshape(-1, self.HAND_SIZE)
+
+    @classmethod
+    def get_card_ints(cls):
+        if cls._card_ints is None:
+            cls._card_ints = numpy.array(
+                [Card.from_index(index).to_int() for index in range(52)],
+                dtype=numpy.int64
+            )
+        return cls._card_ints
+
+    def evaluate(self, start=0, stop=None):
+        card_indexes = self.as_array()[start:stop]
+        return PokerRules.evaluate_batch(self.get_card_ints()[card_indexes])
+
+    def close(self):
+        # Arrays and views returned earlier may outlive the archive, the
+        # mapping is then released along with the last one of them.
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._file.close()
+
+
+class PreflopEquity(object):
+    # Heads-up all-in equity of every starting hand class against every
+    # other one, a header followed by 169 rows of 169 little-endian
+    # unsigned shorts. Equities are scaled by SCALE, which is even so that
+    # both halves of a split add up exactly.
+    MAGIC = b'PYPKPRE\x01'
+    HEADER_SIZE = len(MAGIC)
+    SCALE = 65534
+
+    PATH = os.environ.get(
+        'PYPOKER_PREFLOP',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                     'pypoker_preflop.bin')
+    )
+
+    _table = None
+
+    @classmethod
+    def get(cls):
+        # Only read on first use, importing pypoker does not load it.
+        if cls._table is None:
+            cls._table = cls.load(cls.PATH)
+        return cls._table
+
+    @classmethod
+    def get_equity(cls, hole_class, other_hole_class):
+        classes = PokerRules.HOLE_CLASSES
+        if not (0 <= hole_class < classes and
+                0 <= other_hole_class < classes):
+            raise ValueError('Invalid hole classes %s and %s' %
+                             (hole_class, other_hole_class))
+
+        return cls.get()[hole_class * classes + other_hole_class] / cls.SCALE
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as table_file:
+            data = table_file.read()
+
+        table = array.array('H', data[cls.HEADER_SIZE:])
+        if (data[:cls.HEADER_SIZE] != cls.MAGIC or
+                len(table) != PokerRules.HOLE_CLASSES ** 2):
+            raise ValueError('Invalid preflop equity table %s' % path)
+
+        if sys.byteorder == 'big':
+            table.byteswap()
+        return table
+
+    @classmethod
+    def save(cls, path, table):
+        table = array.array('H', table)
+        if sys.byteorder == 'big':
+            table.byteswap()
+
+        with open(path, 'wb') as table_file:
+            table_file.write(cls.MAGIC)
+            table.tofile(table_file)
+
+    @classmethod
+    def get_boards(cls):
+        # One board out of every class of boards that only differ by a
+        # permutation of suits, with the amount of boards in the class.
+        boards = {}
+        for board_ints in itertools.combinations(PokerRules._get_deck_ints(),
+                                                 5):
+            index = PokerRules.get_canonical_index_by_ints(board_ints)
+            if index in boards:
+                boards[index][1] += 1
+            else:
+                boards[index] = [board_ints, 1]
+
+        return [tuple(board) for _, board in sorted(boards.items())]
+
+    @classmethod
+    def _count_boards(cls, boards):
+        # How many times the combos of every class beat or tie the non
+        # overlapping combos of every other class on the boards, each board
+        # counted as many times as its weight.
+        classes = PokerRules.HOLE_CLASSES
+        combos = []
+        starts = []
+        for hole_class in range(classes):
+            starts.append(len(combos))
+            combos.extend(PokerRules.get_hole_class_combos(hole_class))
+
+        combo_classes = numpy.zeros(len(combos), dtype=numpy.int64)
+        combo_classes[starts[1:]] = 1
+        combo_classes = numpy.cumsum(combo_classes)
+        states = [PokerRules._get_cards_state(cards) for cards in combos]
+        combo_ints = numpy.array(combos, dtype=numpy.int64)
+
+        # Every pair of combos sharing a card, each combo with itself too,
+        # is counted by the ranking below and taken out afterwards.
+        first, second = numpy.nonzero(
+            (combo_ints[:, None, :, None] ==
+             combo_ints[None, :, None, :]).any(axis=(2, 3))
+        )
+        pair_classes = combo_classes[first] * classes + combo_classes[second]
+        indexes = numpy.arange(1, len(combos) + 1)
+
+        get_strength = PokerRules._get_strength_by_states
+        wins = numpy.zeros((classes, classes), dtype=numpy.int64)
+        ties = numpy.zeros((classes, classes), dtype=numpy.int64)
+        for board_ints, weight in boards:
+            board_state = PokerRules._get_cards_state(board_ints)
+            valid = ~numpy.isin(combo_ints, board_ints).any(axis=1)
+            strengths = numpy.array(
+                [get_strength(board_state, state) for state in states]
+            ) * valid
+
+            # The amount of valid combos of every class weaker than or as
+            # strong as each combo.
+            order = numpy.argsort(strengths)
+            ranked = numpy.zeros((len(combos) + 1, classes),
+                                 dtype=numpy.int64)
+            ranked[indexes, combo_classes[order]] = valid[order]
+            ranked = numpy.cumsum(ranked, axis=0)
+            weaker = ranked[numpy.searchsorted(strengths[order], strengths)]
+            tied = ranked[numpy.searchsorted(strengths[order], strengths,
+                                             'right')] - weaker
+
+            both = valid[first] & valid[second]
+            wins += weight * (
+                numpy.add.reduceat(weaker * valid[:, None], starts) -
+                numpy.bincount(
+                    pair_classes,
+                    both & (strengths[second] < strengths[first]),
+                    classes ** 2
+                ).astype(numpy.int64).reshape(classes, classes)
+            )
+            ties += weight * (
+                numpy.add.reduceat(tied * valid[:, None], starts) -
+                numpy.bincount(
+                    pair_classes,
+                    both & (strengths[second] == strengths[first]),
+                    classes ** 2
+                ).astype(numpy.int64).reshape(classes, classes)
+            )
+
+        return wins, ties
+
+    @classmethod
+    def generate(cls, boards=None, workers=1):
+        # Exact equities, every pair of non overlapping combos of both
+        # classes on every board. Boards default to get_boards().
+        if numpy is None:
+            raise ImportError('numpy is required for generate')
+        if boards is None:
+            boards = cls.get_boards()
+
+        chunks = [boards[start:start + 1000]
+                  for start in range(0, len(boards), 1000)]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                counts = list(executor.map(_count_preflop_boards, chunks))
+        else:
+            counts = [_count_preflop_boards(chunk) for chunk in chunks]
+
+        wins = sum(chunk_wins for chunk_wins, _ in counts)
+        ties = sum(chunk_ties for _, chunk_ties in counts)
+
+        # Both halves of a matchup add up to SCALE, a class against itself
+        # or without any pair of combos left on the boards splits evenly.
+        classes = PokerRules.HOLE_CLASSES
+        table = array.array('H', [cls.SCALE // 2]) * classes ** 2
+        for hole_class in range(classes):
+            for other_hole_class in range(hole_class + 1, classes):
+                win = wins[hole_class, other_hole_class]
+                tie = ties[hole_class, other_hole_class]
+                total = win + tie + wins[other_hole_class, hole_class]
+                if not total:
+                    continue
+
+                value = int(round((win + tie / 2) / total * cls.SCALE))
+                table[hole_class * classes + other_hole_class] = value
+                table[other_hole_class * classes + hole_class] = (
+                    cls.SCALE - value
+                )
+
+        return table
+
+
+class Instrumentation(object):
+    # Wraps the instrumented methods only while enabled, so they run
+    # untouched (and at full speed) the rest of the time.
+    METHODS = [
+        (Card, ['parse_from_string']),
+        (Hand, ['parse_cards_string', 'from_string', 'from_ints']),
+        (PokerRules, [
+            'classify', 'evaluate',
+            'is_royal_flush', 'is_straight_flush', 'is_four_of_a_kind',
+            'is_full_house', 'is_flush', 'is_straight', 'is_tree_of_a_kind',
+            'is_two_pair', 'is_one_pair', 'is_high_card',
+            'untie_royal_flush', 'untie_straight_flush',
+            'untie_four_of_a_kind', 'untie_full_house', 'untie_flush',
+            'untie_straight', 'untie_tree_of_a_kind', 'untie_two_pair',
+            'untie_one_pair', 'untie_high_card',
+            'get_strength_by_ints', 'get_best_strength_by_ints',
+            '_get_strength_by_states',
+        ]),
+        (Showdown, ['_get_strengths']),
+    ]
+
+    # The methods are shared by every instance, so they are patched once
+    # while any instance is enabled and every enabled one is recorded to.
+    _originals = {}
+    _instances = []
+    _patch_lock = threading.Lock()
+
+    def __init__(self):
+        self.callback = None
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return any(instance is self for instance in self._instances)
+
+    def enable(self, callback=None):
+        if callback is not None:
+            self.callback = callback
+
+        with self._patch_lock:
+            if self.enabled:
+                return
+            if not self._instances:
+                self._patch()
+            self._instances.append(self)
+
+    def disable(self):
+        with self._patch_lock:
+            if not self.enabled:
+                return
+            self._instances[:] = [
+                instance for instance in self._instances
+                if instance is not self
+            ]
+            if not self._instances:
+                for (cls, name), original in self._originals.items():
+                    setattr(cls, name, original)
+                self._originals.clear()
+
+    @classmethod
+    def _patch(cls):
+        for owner, names in cls.METHODS:
+            for name in names:
+                original = owner.__dict__[name]
+                cls._originals[owner, name] = original
+                if isinstance(original, classmethod):
+                    setattr(owner, name, classmethod(cls._wrap(
+                        '%s.%s' % (owner.__name__, name), original.__func__
+                    )))
+                else:
+                    setattr(owner, name, cls._wrap(
+                        '%s.%s' % (owner.__name__, name), original
+                    ))
+
+    @classmethod
+    def _wrap(cls, name, func):
+        instances = cls._instances
+        is_classify = name == 'PokerRules.classify'
+
+        def instrumented(*args, **kwargs):
+            start = timeit.default_timer()
+            result = func(*args, **kwargs)
+            elapsed = timeit.default_timer() - start
+
+            for instance in list(instances):
+                instance.record(name, elapsed)
+                if is_classify:
+                    instance.record(
+                        '%s[%s]' % (name, PokerRules.VALUES.get(result)),
+                        elapsed
+                    )
+            return result
+
+        instrumented.__name__ = func.__name__
+        return instrumented
+
+    def record(self, name, elapsed):
+        with self._lock:
+            counter = self._counters.setdefault(name, [0, 0.0])
+            counter[0] += 1
+            counter[1] += elapsed
+
+        if self.callback is not None:
+            self.callback(name, elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(
+                (name, {'calls': calls, 'time': total_time})
+                for name, (calls, total_time) in self._counters.items()
+            )
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+PokerRules.instrumentation = Instrumentation()
@@ -0,0 +1,120 @@
+import asyncio
+
+from pypoker import PokerRules
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def evaluate_batch(batch):
+    # Runs on the executor, so it has to be a module level function for
+    # process pools. Returns (numeric value, strength) per tuple of 5 to 7
+    # card ints.
+    if numpy is not None and all(len(card_ints) == 5 for card_ints in batch):
+        categories, strengths = PokerRules.evaluate_batch(batch)
+        return list(zip(categories.tolist(), strengths.tolist()))
+
+    results = []
+    for card_ints in batch:
+        strength = PokerRules.get_best_strength_by_ints(card_ints)
+        results.append(
+            (PokerRules.get_numeric_value_by_strength(strength), strength)
+        )
+    return results
+
+
+class BatchEvaluator(object):
+    # Collects the evaluations requested by many coroutines into batches,
+    # sent to the executor once batch_size requests are waiting or the
+    # oldest one has waited max_latency seconds, so the event loop never
+    # evaluates hands itself. The default executor of the loop is used
+    # when none is given.
+    def __init__(self, batch_size=256, max_latency=0.002, executor=None):
+        if batch_size < 1:
+            raise ValueError('Invalid batch size %s' % batch_size)
+        if max_latency < 0:
+            raise ValueError('Invalid max latency %s' % max_latency)
+
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.executor = executor
+        self.batches = 0
+        self._pending = []
+        self._timer = None
+        self._running = set()
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def submit_ints(self, card_ints):
+        if self._closed:
+            raise RuntimeError('BatchEvaluator is closed')
+        if not 5 <= len(card_ints) <= 7:
+            raise ValueError('5 to 7 cards required %s given' %
+                             len(card_ints))
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((tuple(card_ints), future))
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_latency, self.flush)
+        return future
+
+    def submit(self, cards):
+        return self.submit_ints([card.to_int() for card in cards])
+
+    async def evaluate(self, hand):
+        return await self.submit(hand.cards)
+
+    async def compare(self, hand, other_hand):
+        # Same result as cmp(hand, other_hand), 1, 0 or -1.
+        (_, strength), (_, other_strength) = await asyncio.gather(
+            self.submit(hand.cards), self.submit(other_hand.cards)
+        )
+        return (strength > other_strength) - (strength < other_strength)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, evaluate_batch,
+                [card_ints for card_ints, _ in batch]
+            )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        # Evaluates whatever is still waiting before returning.
+        self._closed = True
+        self.flush()
+        if self._running:
+            await asyncio.gather(*self._running)
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import queue
+import random
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+import timeit
+
+from pypoker import Card
+from pypoker import PokerRules
+
+# Requests are the amount of cards followed by 7 card indexes (0 for 2C up
+# to 51 for AS, unused ones are ignored). Responses are a status, the
+# numeric value and the strength of the best hand out of the cards.
+REQUEST = struct.Struct('!B7B')
+RESPONSE = struct.Struct('!BBH')
+
+OK = 0
+INVALID_REQUEST = 1
+
+CARD_INTS = [Card.from_index(index).to_int() for index in range(52)]
+
+
+def evaluate_request(frame):
+    amount, indexes = frame[0], frame[1:frame[0] + 1]
+    if (not 5 <= amount <= 7 or max(indexes) >= 52 or
+            len(set(indexes)) != amount):
+        return RESPONSE.pack(INVALID_REQUEST, 0, 0)
+
+    strength = PokerRules.get_best_strength_by_ints(
+        [CARD_INTS[index] for index in indexes]
+    )
+    return RESPONSE.pack(
+        OK, PokerRules.get_numeric_value_by_strength(strength), strength
+    )
+
+
+class EvaluationHandler(socketserver.BaseRequestHandler):
+    # Connections are kept open and requests may be pipelined, every frame
+    # received so far is answered in order with a single write.
+    BUFFER_SIZE = REQUEST.size * 4096
+
+    def handle(self):
+        pending = b''
+        while True:
+            data = self.request.recv(self.BUFFER_SIZE)
+            if not data:
+                return
+
+            pending += data
+            complete = len(pending) - len(pending) % REQUEST.size
+            if not complete:
+                continue
+
+            self.request.sendall(b''.join(
+                evaluate_request(REQUEST.unpack_from(pending, start))
+                for start in range(0, complete, REQUEST.size)
+            ))
+            pending = pending[complete:]
+
+
+class TCPEvaluationServer(socketserver.ThreadingMixIn,
+                          socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class UnixEvaluationServer(socketserver.ThreadingMixIn,
+                               socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(address):
+    # A (host, port) tuple listens on TCP and a string on a Unix socket.
+    if isinstance(address, tuple):
+        return TCPEvaluationServer(address, EvaluationHandler)
+    # Only a stale socket left by a previous server is removed.
+    if os.path.exists(address):
+        if not stat.S_ISSOCK(os.stat(address).st_mode):
+            raise ValueError('Not a socket %s' % address)
+        os.remove(address)
+    return UnixEvaluationServer(address, EvaluationHandler)
+
+
+class EvaluationClient(object):
+    # Keeps up to pool_size connections open and shared between threads,
+    # each call borrowing one for as long as it takes. Batches are sent
+    # WINDOW requests at a time, whose responses are read before sending
+    # more, so neither side blocks writing into a full socket buffer.
+    WINDOW = 4096
+
+    def __init__(self, address, pool_size=4, timeout=10):
+        self.address = address
+        self.timeout = timeout
+        self._pool = queue.Queue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(pool_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self):
+        if isinstance(self.address, tuple):
+            connection = socket.create_connection(self.address, self.timeout)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            connection.connect(self.address)
+
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _receive(self, connection, size):
+        data = b''
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                raise IOError('Connection closed by the server')
+            data += chunk
+        return data
+
+    def _send_window(self, connection, frames):
+        connection.sendall(b''.join(frames))
+        return self._receive(connection, RESPONSE.size * len(frames))
+
+    def evaluate_many(self, card_ints_per_hand):
+        # Every window of requests is sent at once and then its responses
+        # are read, so a batch costs a round trip per window.
+        frames = []
+        for card_ints in card_ints_per_hand:
+            indexes = [Card.from_int(card_int).to_index()
+                       for card_int in card_ints]
+            if not 5 <= len(indexes) <= 7:
+                raise ValueError('5 to 7 cards required %s given' %
+                                 len(indexes))
+            frames.append(REQUEST.pack(
+                len(indexes), *(indexes + [0] * (7 - len(indexes)))
+            ))
+
+        self._semaphore.acquire()
+        try:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                data = b''.join(
+                    self._send_window(connection,
+                                      frames[start:start + self.WINDOW])
+                    for start in range(0, len(frames), self.WINDOW)
+                )
+            except Exception:
+                self._discard(connection)
+                raise
+            self._pool.put(connection)
+        finally:
+            self._semaphore.release()
+
+        results = []
+        for start in range(0, len(data), RESPONSE.size):
+            status, numeric_value, strength = RESPONSE.unpack_from(data,
+                                                                   start)
+            if status != OK:
+                raise ValueError('Invalid request %s' %
+                                 list(card_ints_per_hand)[len(results)])
+            results.append((numeric_value, strength))
+        return results
+
+    def evaluate_ints(self, card_ints):
+        return self.evaluate_many([card_ints])[0]
+
+    def evaluate(self, hand):
+        return self.evaluate_ints(hand.to_ints())
+
+    def _discard(self, connection):
+        with self._lock:
+            self._connections.remove(connection)
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            del self._connections[:]
+            self._pool = queue.Queue()
+
+
+def parse_address(tcp, unix):
+    if unix:
+        return unix
+    host, _, port = tcp.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def generate_load(address, requests=100000, concurrency=4, pipeline=64,
+                  seed=20161018):
+    # Every thread sends batches of `pipeline` random 7-card hands over
+    # its own pooled connection. Latencies are per batch round trip.
+    rng = random.Random(seed)
+    batches = [
+        [[CARD_INTS[index] for index in rng.sample(range(52), 7)]
+         for _ in range(min(pipeline, requests - start))]
+        for start in range(0, requests, pipeline)
+    ]
+    latencies = []
+    errors = []
+
+    def worker(thread_batches):
+        try:
+            for batch in thread_batches:
+                start = timeit.default_timer()
+                client.evaluate_many(batch)
+                latencies.append(timeit.default_timer() - start)
+        except Exception as error:
+            errors.append(error)
+
+    with EvaluationClient(address, pool_size=concurrency) as client:
+        threads = [
+            threading.Thread(target=worker,
+                             args=(batches[index::concurrency],))
+            for index in range(concurrency)
+        ]
+        start = timeit.default_timer()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = timeit.default_timer() - start
+
+    if errors:
+        raise errors[0]
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'pipeline': pipeline,
+        'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'p50_latency': latencies[len(latencies) // 2],
+        'p99_latency': latencies[min(len(latencies) - 1,
+                                     len(latencies) * 99 // 100)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Serves pypoker hand evaluations over TCP or a Unix '
+                    'socket, or generates load against such a server.'
+    )
+    parser.add_argument('command', choices=['serve', 'load'])
+    parser.add_argument('--tcp', default='127.0.0.1:7462',
+                        help='host:port (default: 127.0.0.1:7462)')
+    parser.add_argument('--unix', help='Unix socket path, instead of TCP')
+    parser.add_argument('--requests', type=int, default=100000,
+                        help='load: hands to evaluate (default: 100000)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='load: client threads (default: 4)')
+    parser.add_argument('--pipeline', type=int, default=64,
+                        help='load: requests per round trip (default: 64)')
+    args = parser.parse_args(argv)
+    address = parse_address(args.tcp, args.unix)
+
+    if args.command == 'serve':
+        server = make_server(address)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        results = generate_load(address, args.requests, args.concurrency,
+                                args.pipeline)
+        sys.stdout.write(json.dumps(results, indent=2, sort_keys=True) + '\n')
+
+
+if __name__ == '__main__':
+    main()
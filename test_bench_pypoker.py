@@ -0,0 +1,71 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import bench_pypoker
+from pypoker import PokerRules
+
+
+class TestBenchPypoker(unittest.TestCase):
+
+    def test_make_hand(self):
+        rng = random.Random(1)
+        for numeric_value in PokerRules.VALUES:
+            hand = bench_pypoker.make_hand(rng, numeric_value)
+            self.assertEqual(PokerRules.classify(hand), numeric_value)
+
+    def test_run(self):
+        results = bench_pypoker.run(size=20, repeat=2, name_filter='hand.')
+        names = [benchmark['name'] for benchmark in results['benchmarks']]
+
+        self.assertIn('hand.from_string', names)
+        self.assertIn('hand.sort', names)
+        self.assertIn('hand.compare.warm', names)
+        self.assertEqual(
+            len([name for name in names if name.startswith('hand.compare')]),
+            len(PokerRules.VALUES) + 1
+        )
+        for benchmark in results['benchmarks']:
+            self.assertTrue(
+                benchmark['min'] <= benchmark['median'] <= benchmark['max']
+            )
+
+    def test_main_writes_json(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'bench.json')
+        try:
+            bench_pypoker.main([
+                '--size', '10', '--repeat', '1',
+                '--filter', 'card.parse', '--output', path,
+            ])
+            with open(path) as output_file:
+                results = json.load(output_file)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(results['seed'], bench_pypoker.SEED)
+        self.assertEqual(
+            [benchmark['name'] for benchmark in results['benchmarks']],
+            ['card.parse_from_string']
+        )
+
+    def test_compare(self):
+        before = bench_pypoker.run(size=10, repeat=1, name_filter='card.')
+        after = bench_pypoker.run(size=10, repeat=1, name_filter='card.')
+        after['benchmarks'] = after['benchmarks'][:1]
+
+        comparison = bench_pypoker.compare(before, after)
+        self.assertEqual(
+            [benchmark['name'] for benchmark in comparison['benchmarks']],
+            ['card.parse_from_string']
+        )
+        benchmark = comparison['benchmarks'][0]
+        self.assertAlmostEqual(benchmark['speedup'],
+                               benchmark['before'] / benchmark['after'])
+
+
+if __name__ == '__main__':
+    unittest.main()
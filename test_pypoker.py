@@ -1,7 +1,29 @@
+import heapq
+import io
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from pypoker import Card
+from pypoker import Deck
 from pypoker import Hand
+from pypoker import HandArchive
+from pypoker import IncrementalEvaluator
+from pypoker import Instrumentation
+from pypoker import LRUCache
+from pypoker import LookupTables
 from pypoker import PokerRules
+from pypoker import PreflopEquity
+from pypoker import Range
+from pypoker import Showdown
 
 
 class TestCard(unittest.TestCase):
@@ -14,8 +36,8 @@ class TestCard(unittest.TestCase):
         self.card = Card(self.value, self.suit)
 
     def test__init__(self):
-        self.assertEquals(self.card.suit, self.suit)
-        self.assertEquals(self.card.value, self.value)
+        self.assertEqual(self.card.suit, self.suit)
+        self.assertEqual(self.card.value, self.value)
 
     def test__init__raise_error(self):
         with self.assertRaises(ValueError):
@@ -44,20 +66,77 @@ class TestCard(unittest.TestCase):
 
     def test_parse_from_string(self):
         card = Card.parse_from_string('4C')
-        self.assertEquals(card.suit, 'C')
-        self.assertEquals(card.value, '4')
+        self.assertEqual(card.suit, 'C')
+        self.assertEqual(card.value, '4')
 
     def test_parse_from_string_when_has_invalid_string(self):
         with self.assertRaises(ValueError):
             Card.parse_from_string('4')
 
-    def test_card__cmp__(self):
+    def test_to_int(self):
+        self.assertEqual(Card('K', 'D').to_int(), 0x08004B25)
+        self.assertEqual(Card('5', 'S').to_int(), 0x00081307)
+        self.assertEqual(Card('J', 'C').to_int(), 0x0200891D)
+
+    def test_from_int(self):
+        for value in Card.VALUES:
+            for suit in Card.SUITS:
+                card = Card.from_int(Card(value, suit).to_int())
+                self.assertEqual(card.value, value)
+                self.assertEqual(card.suit, suit)
+
+    def test_from_int_when_is_invalid(self):
+        with self.assertRaises(ValueError):
+            Card.from_int(0)
+
+        with self.assertRaises(ValueError):
+            Card.from_int(0x08004B25 | 0x8000)
+
+    def test_to_index(self):
+        self.assertEqual(Card('2', 'C').to_index(), 0)
+        self.assertEqual(Card('2', 'S').to_index(), 3)
+        self.assertEqual(Card('A', 'S').to_index(), 51)
+
+    def test_from_index(self):
+        for index in range(52):
+            self.assertEqual(Card.from_index(index).to_index(), index)
+
+        with self.assertRaises(ValueError):
+            Card.from_index(52)
+
+    def test_cards_are_interned(self):
+        self.assertIs(Card('A', 'S'), Card('A', 'S'))
+        self.assertIs(Card.parse_from_string('AS'), Card('A', 'S'))
+        self.assertIs(Card.from_int(Card('A', 'S').to_int()), Card('A', 'S'))
+        self.assertIs(Card.from_index(51), Card('A', 'S'))
+        self.assertIs(pickle.loads(pickle.dumps(self.card)), self.card)
+
+    def test_cards_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.card.suit = 'D'
+
+        with self.assertRaises(AttributeError):
+            del self.card.value
+
+        self.assertFalse(hasattr(self.card, '__dict__'))
+
+    def test_card_comparison(self):
         card1 = Card('4', 'C')
         card2 = Card('T', 'C')
 
         self.assertTrue(card1 < card2)
         self.assertTrue(card2 > card1)
         self.assertTrue(card1 == card1)
+        self.assertTrue(card1 <= Card('4', 'H'))
+        self.assertTrue(card2 >= card1)
+        self.assertTrue(card1 != card2)
+        self.assertFalse(card1 == '4C')
+        with self.assertRaises(TypeError):
+            card1 < '4C'
+
+    def test_card__hash__(self):
+        self.assertEqual(hash(Card('4', 'C')), hash(Card('4', 'S')))
+        self.assertNotEqual(hash(Card('4', 'C')), hash(Card('5', 'C')))
 
 
 class TestHand(unittest.TestCase):
@@ -74,11 +153,11 @@ class TestHand(unittest.TestCase):
 
     def test__init__(self):
         self.hand = Hand(self.expected_cards)
-        self.assertEquals(self.hand.cards, self.expected_cards)
+        self.assertEqual(self.hand.cards, self.expected_cards)
 
     def test__str__(self):
         hand = Hand(self.expected_cards)
-        self.assertEquals(
+        self.assertEqual(
             str(hand),
             "<hand [4D, 4D, 4D, 7H, 8D], 'Tree of a Kind'>"
         )
@@ -87,8 +166,36 @@ class TestHand(unittest.TestCase):
         cards = Hand.parse_cards_string(self.cards_string)
         for index, card in enumerate(cards):
             expected_card = self.expected_cards[index]
-            self.assertEquals(expected_card.suit, card.suit)
-            self.assertEquals(expected_card.value, card.value)
+            self.assertEqual(expected_card.suit, card.suit)
+            self.assertEqual(expected_card.value, card.value)
+
+    def test_parse_cards_string_does_not_recurse(self):
+        cards_string = ' '.join(['4D'] * 5000)
+        self.assertEqual(
+            len(Hand.parse_cards_string(cards_string)), Hand.MAX_CARDS
+        )
+
+    def test_iter_hands(self):
+        file_obj = io.StringIO(u'4D 4D 4D 7H 8D\n\n2C TD 6S 4D 8H\n')
+        hands = Hand.iter_hands(file_obj)
+
+        self.assertEqual(next(hands).hand_value, 'Tree of a Kind')
+        self.assertEqual(next(hands).hand_value, 'High Card')
+        self.assertEqual(list(hands), [])
+
+    def test_iter_hands_as_ints(self):
+        file_obj = io.StringIO(u'4D 4D 4D 7H 8D\n')
+        self.assertEqual(
+            list(Hand.iter_hands(file_obj, as_ints=True)),
+            [tuple(card.to_int() for card in self.expected_cards)]
+        )
+
+    def test_iter_hands_when_has_invalid_line(self):
+        with self.assertRaises(ValueError):
+            list(Hand.iter_hands(io.StringIO(u'4D 4D 4D 7H\n')))
+
+        with self.assertRaises(ValueError):
+            list(Hand.iter_hands(io.StringIO(u'4D 4D 4D 7H 8X\n')))
 
     def test_from_string(self):
         hand = Hand.from_string(self.cards_string)
@@ -98,12 +205,124 @@ class TestHand(unittest.TestCase):
         with self.assertRaises(ValueError):
             Hand.from_string(self.cards_string[:3])
 
+    def test_from_ints(self):
+        card_ints = [card.to_int() for card in self.expected_cards]
+        hand = Hand.from_ints(card_ints)
+        self.assertEqual(hand.to_ints(), card_ints)
+        self.assertEqual(str(hand), str(Hand(self.expected_cards)))
+
+        with self.assertRaises(ValueError):
+            Hand.from_ints(card_ints[:3])
+
+    def test_best_of(self):
+        cards = Hand.parse_cards_string('2C 3D 6D 4H 5S') + [
+            Card.parse_from_string('6C'),
+            Card.parse_from_string('7C'),
+        ]
+        hand = Hand.best_of(cards)
+        self.assertEqual(PokerRules.classify(hand), PokerRules.STRAIGHT)
+        self.assertEqual(max(hand.sorted_cards).value, '7')
+
+    def test_canonical_index(self):
+        hand = Hand.from_string('AS KS 7H 7D 2C')
+        isomorphic = Hand.from_string('AC KC 7D 7S 2H')
+        other = Hand.from_string('AS KH 7H 7D 2C')
+
+        self.assertEqual(hand.canonical_index(), isomorphic.canonical_index())
+        self.assertNotEqual(hand.canonical_index(), other.canonical_index())
+        self.assertTrue(0 <= hand.canonical_index() < 134459)
+
+    def test_canonical_index_when_has_repeated_cards(self):
+        with self.assertRaises(ValueError):
+            Hand.from_string('AS AS 7H 7D 2C').canonical_index()
+
+    def test_evaluation_is_cached(self):
+        hands = [
+            Hand.from_string('4D 3D 3C 7H AD'),
+            Hand.from_string('4D 3D 3C 4H AD'),
+            Hand.from_string('2C TD 6S 4D 8H'),
+        ]
+        PokerRules.cache.clear()
+        calls = []
+        get_strength_by_ints = PokerRules.__dict__['get_strength_by_ints']
+
+        def counted_get_strength_by_ints(card_ints):
+            calls.append(card_ints)
+            return get_strength_by_ints.__get__(None, PokerRules)(card_ints)
+
+        PokerRules.get_strength_by_ints = staticmethod(
+            counted_get_strength_by_ints
+        )
+        try:
+            for _ in range(3):
+                sorted(hands)
+        finally:
+            PokerRules.get_strength_by_ints = get_strength_by_ints
+
+        self.assertEqual(len(calls), len(hands))
+
+    def test_cards_reassignment_invalidates_the_evaluation(self):
+        hand = Hand.from_string('2C TD 6S 4D 8H')
+        self.assertEqual(hand.hand_value, 'High Card')
+        self.assertEqual(max(hand.sorted_cards).value, 'T')
+
+        hand.cards = self.expected_cards
+        self.assertEqual(hand.hand_value, 'Tree of a Kind')
+        self.assertEqual(max(hand.sorted_cards).value, '8')
+        self.assertEqual(
+            hand.strength,
+            PokerRules.get_strength_by_ints(hand.to_ints())
+        )
+
+    def test_strength_key(self):
+        hands = [
+            Hand.from_string('4D 3D 3C 4H AD'),
+            Hand.from_string('2C TD 6S 4D 8H'),
+            Hand.from_string('TD JD QD AD KD'),
+            Hand.from_string('4D 3D 3C 7H AD'),
+        ]
+        ranked = sorted(hands, key=Hand.strength_key)
+
+        self.assertEqual(
+            [hand.hand_value for hand in ranked],
+            ['High Card', 'One Pair', 'Two Pair', 'Royal Flush']
+        )
+        self.assertIs(max(hands, key=Hand.strength_key), hands[2])
+        self.assertEqual(
+            heapq.nlargest(2, hands, key=Hand.strength_key),
+            [hands[2], hands[0]]
+        )
+
+    def test_rich_comparison(self):
+        one_pair = Hand.from_string('4D 3D 3C 7H AD')
+        same_one_pair = Hand.from_string('4S 3S 3H 7D AC')
+        two_pair = Hand.from_string('4D 3D 3C 4H AD')
+
+        self.assertTrue(one_pair < two_pair)
+        self.assertTrue(one_pair <= same_one_pair)
+        self.assertTrue(two_pair > one_pair)
+        self.assertTrue(two_pair >= one_pair)
+        self.assertTrue(one_pair == same_one_pair)
+        self.assertTrue(one_pair != two_pair)
+        self.assertFalse(one_pair == 'not a hand')
+        self.assertEqual(sorted([two_pair, one_pair]), [one_pair, two_pair])
+        with self.assertRaises(TypeError):
+            one_pair < 'not a hand'
+
+    def test__hash__(self):
+        one_pair = Hand.from_string('4D 3D 3C 7H AD')
+        same_one_pair = Hand.from_string('4S 3S 3H 7D AC')
+        two_pair = Hand.from_string('4D 3D 3C 4H AD')
+
+        self.assertEqual(hash(one_pair), hash(same_one_pair))
+        self.assertEqual(len(set([one_pair, same_one_pair, two_pair])), 2)
+
     def test_amount_of_cards(self):
         hand = Hand()
-        self.assertEquals(hand.amount_of_cards(), 0)
+        self.assertEqual(hand.amount_of_cards(), 0)
 
         hand.cards = self.expected_cards
-        self.assertEquals(hand.amount_of_cards(), 5)
+        self.assertEqual(hand.amount_of_cards(), 5)
 
     def test_has_correct_amount_of_cards(self):
         hand = Hand()
@@ -233,6 +452,470 @@ class TestPokerRules(unittest.TestCase):
 
         self.assertFalse(PokerRules.is_high_card(hand))
 
+    def test_classify(self):
+        hands = {
+            'TD JD QD AD KD': PokerRules.ROYAL_FLUSH,
+            '2D 3D 6D 4D 5D': PokerRules.STRAIGHT_FLUSH,
+            '2C 3D 3H 3S 3D': PokerRules.FOUR_OF_A_KIND,
+            '2C 3S 2D 3D 2H': PokerRules.FULL_HOUSE,
+            'AD 2D 3D 4D 9D': PokerRules.FLUSH,
+            '2C 3D 6D 4H 5S': PokerRules.STRAIGHT,
+            '2C 2D 3S 4D 2H': PokerRules.TREE_OF_A_KIND,
+            '2C 2D 3S 4D 3H': PokerRules.TWO_PAIR,
+            '2C TD 6S 4D 2H': PokerRules.ONE_PAIR,
+            '2C TD 6S 4D 8H': PokerRules.HIGH_CARD,
+        }
+
+        for cards_string, expected_value in hands.items():
+            hand = Hand.from_string(cards_string)
+            self.assertEqual(PokerRules.classify(hand), expected_value)
+            self.assertEqual(
+                PokerRules.get_value_by_hand(hand),
+                PokerRules.VALUES[expected_value]
+            )
+
+    def test_is_straight_when_ace_is_low(self):
+        hand = Hand.from_string('AC 2D 3S 4D 5H')
+        self.assertTrue(PokerRules.is_straight(hand))
+        self.assertEqual(PokerRules.classify(hand), PokerRules.STRAIGHT)
+
+    def test_get_strength_by_hand(self):
+        self.assertEqual(
+            PokerRules.get_strength_by_hand(
+                Hand.from_string('TS JS QS KS AS')
+            ),
+            LookupTables.MAX_STRENGTH
+        )
+        self.assertEqual(
+            PokerRules.get_strength_by_hand(
+                Hand.from_string('7S 5D 4S 3C 2S')
+            ),
+            1
+        )
+
+        wheel = Hand.from_string('AC 2D 3S 4D 5H')
+        six_high_straight = Hand.from_string('6C 2D 3S 4D 5H')
+        three_of_a_kind = Hand.from_string('AC AD AS 4D 5H')
+        self.assertEqual(
+            PokerRules.get_strength_by_hand(six_high_straight),
+            PokerRules.get_strength_by_hand(wheel) + 1
+        )
+        self.assertGreater(wheel, three_of_a_kind)
+
+    def test_get_strength_by_ints(self):
+        hand = Hand.from_string('9C 9D 9H KS KC')
+        self.assertEqual(
+            PokerRules.get_strength_by_ints(hand.to_ints()),
+            PokerRules.get_strength_by_hand(hand)
+        )
+
+    def test_best_hand(self):
+        cards = [
+            Card.parse_from_string(card_string)
+            for card_string in 'KS 2S 9H 7S 9D 5S 4S'.split()
+        ]
+        hand, strength = PokerRules.best_hand(cards)
+        self.assertEqual(PokerRules.classify(hand), PokerRules.FLUSH)
+        self.assertEqual(strength, PokerRules.get_strength_by_hand(hand))
+
+        cards = [
+            Card.parse_from_string(card_string)
+            for card_string in 'AS 2D 3S 4S 5S 9D'.split()
+        ]
+        hand, strength = PokerRules.best_hand(cards)
+        self.assertEqual(PokerRules.classify(hand), PokerRules.STRAIGHT)
+
+        cards = [
+            Card.parse_from_string(card_string)
+            for card_string in '9S 9D 9H KS KD KH 2C'.split()
+        ]
+        hand, strength = PokerRules.best_hand(cards)
+        self.assertEqual(
+            hand.sorted_cards, Hand.from_string('9S 9D KS KD KH').sorted_cards
+        )
+        self.assertEqual(PokerRules.classify(hand), PokerRules.FULL_HOUSE)
+
+    def test_best_hand_when_has_wrong_amount_of_cards(self):
+        with self.assertRaises(ValueError):
+            PokerRules.best_hand(Hand.parse_cards_string('2C 3D 6D 4H'))
+
+    def test_get_best_by_ints_matches_every_5_card_subset(self):
+        card_strings = [
+            'AS KS QS JS TS 9S 8S', 'AS AD AH AC KS KD 2C',
+            '2C 3C 4C 5C 7D 8D 9H', 'AS 2S 3S 4S 5S 6D 7D',
+            '8C 8D 3S 3H 2C 2D KC', 'JC TD 9S 8H 7C 6D 5C',
+        ]
+        for card_string in card_strings:
+            card_ints = [
+                Card.parse_from_string(card).to_int()
+                for card in card_string.split()
+            ]
+            strength, five = PokerRules.get_best_by_ints(card_ints)
+            self.assertEqual(strength, max(
+                PokerRules.get_strength_by_ints(subset)
+                for subset in itertools.combinations(card_ints, 5)
+            ))
+            self.assertEqual(PokerRules.get_strength_by_ints(five), strength)
+
+    def test_get_numeric_value_by_strength(self):
+        for cards_string in ['TD JD QD AD KD', '2C 3D 3H 3S 3D',
+                             '2C 2D 3S 4D 2H', '2C TD 6S 4D 8H']:
+            hand = Hand.from_string(cards_string)
+            self.assertEqual(
+                PokerRules.get_numeric_value_by_strength(
+                    PokerRules.get_strength_by_hand(hand)
+                ),
+                PokerRules.classify(hand)
+            )
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_evaluate_batch(self):
+        hands = [
+            Hand.from_string(cards_string) for cards_string in [
+                'TD JD QD AD KD', '2D 3D 6D 4D 5D', '2C 3D 3H 3S 3D',
+                '2C 3S 2D 3D 2H', 'AD 2D 3D 4D 9D', '2C 3D 6D 4H 5S',
+                '2C 2D 3S 4D 2H', '2C 2D 3S 4D 3H', '2C TD 6S 4D 2H',
+                '2C TD 6S 4D 8H',
+            ]
+        ]
+        categories, strengths = PokerRules.evaluate_batch(
+            numpy.array([hand.to_ints() for hand in hands])
+        )
+
+        self.assertEqual(categories.dtype, numpy.int32)
+        self.assertEqual(strengths.dtype, numpy.int32)
+        self.assertEqual(
+            list(categories), [PokerRules.classify(hand) for hand in hands]
+        )
+        self.assertEqual(
+            list(strengths),
+            [PokerRules.get_strength_by_hand(hand) for hand in hands]
+        )
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_evaluate_batch_when_has_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            PokerRules.evaluate_batch(numpy.zeros((3, 4), dtype=numpy.int64))
+
+    def test_equity(self):
+        hole_cards_per_player = [
+            Hand.parse_cards_string('AS AD'),
+            Hand.parse_cards_string('KS KD'),
+        ]
+        results = PokerRules.equity(
+            hole_cards_per_player, iterations=2000, seed=1
+        )
+
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(
+                result['win'] + result['tie'] + result['loss'], 2000
+            )
+        self.assertAlmostEqual(
+            results[0]['equity'] + results[1]['equity'], 1.0
+        )
+        self.assertTrue(0.75 < results[0]['equity'] < 0.90)
+        self.assertEqual(
+            results,
+            PokerRules.equity(hole_cards_per_player, iterations=2000, seed=1)
+        )
+
+    def test_equity_when_board_is_complete(self):
+        results = PokerRules.equity(
+            [Hand.parse_cards_string('AS AD'),
+             Hand.parse_cards_string('KS KD')],
+            board=Hand.parse_cards_string('TC JC QC KC AC'),
+            iterations=10
+        )
+        self.assertEqual(
+            [result['tie'] for result in results], [10, 10]
+        )
+        self.assertEqual(
+            [result['equity'] for result in results], [0.5, 0.5]
+        )
+
+    def test_equity_when_has_wrong_amount_of_hole_cards(self):
+        for hole_cards in ('AS AD KC', '', 'AS'):
+            with self.assertRaises(ValueError):
+                PokerRules.equity([
+                    Hand.parse_cards_string(hole_cards),
+                    Hand.parse_cards_string('QS QD'),
+                ], iterations=100, seed=1)
+            with self.assertRaises(ValueError):
+                PokerRules.exact_equity([
+                    Hand.parse_cards_string(hole_cards),
+                    Hand.parse_cards_string('QS QD'),
+                ], board=Hand.parse_cards_string('2C 7H 9D 3S'))
+
+    def test_equity_when_cards_are_repeated(self):
+        with self.assertRaises(ValueError):
+            PokerRules.equity([
+                Hand.parse_cards_string('AS AD'),
+                Hand.parse_cards_string('AS KD'),
+            ])
+
+    def test_equity_with_workers(self):
+        hole_cards_per_player = [
+            Hand.parse_cards_string('AS KS'),
+            Hand.parse_cards_string('QH QD'),
+            Hand.parse_cards_string('7C 2D'),
+        ]
+        self.assertEqual(
+            PokerRules.equity(hole_cards_per_player, iterations=3000,
+                              workers=2, seed=7),
+            PokerRules.equity(hole_cards_per_player, iterations=3000,
+                              seed=7)
+        )
+
+    def test_get_best_strength_by_ints(self):
+        card_strings = [
+            'AS KS QS JS TS 9S 8S', 'AS AD AH AC KS KD 2C',
+            '2C 3C 4C 5C 7D 8D 9H', 'AS 2S 3S 4S 5S 6D',
+            '8C 8D 3S 3H 2C 2D KC', 'JC TD 9S 8H 7C',
+        ]
+        for card_string in card_strings:
+            card_ints = [
+                Card.parse_from_string(card).to_int()
+                for card in card_string.split()
+            ]
+            self.assertEqual(
+                PokerRules.get_best_strength_by_ints(card_ints),
+                PokerRules.get_best_by_ints(card_ints)[0]
+            )
+
+    def test_exact_equity(self):
+        hole_cards_per_player = [
+            Hand.parse_cards_string('AS AH'),
+            Hand.parse_cards_string('KS KH'),
+        ]
+        board = Hand.parse_cards_string('2C 2D 3S')
+        results = PokerRules.exact_equity(hole_cards_per_player, board)
+
+        hole_ints = [
+            tuple(card.to_int() for card in cards)
+            for cards in hole_cards_per_player
+        ]
+        board_ints = tuple(card.to_int() for card in board)
+        deck = PokerRules._get_deck_ints(
+            hole_ints[0] + hole_ints[1] + board_ints
+        )
+        wins = [0, 0]
+        for turn_and_river in itertools.combinations(deck, 2):
+            strengths = [
+                PokerRules.get_best_by_ints(
+                    cards + board_ints + turn_and_river
+                )[0]
+                for cards in hole_ints
+            ]
+            wins[0] += strengths[0] > strengths[1]
+            wins[1] += strengths[1] > strengths[0]
+
+        self.assertEqual(
+            [result['win'] for result in results], wins
+        )
+        self.assertEqual(
+            sum(results[0][key] for key in ('win', 'tie', 'loss')), 990
+        )
+
+    def test_canonical_index_classes(self):
+        card_ints = [Card.from_index(index).to_int() for index in range(52)]
+        indexes = set(
+            PokerRules.get_canonical_index_by_ints(cards)
+            for cards in itertools.combinations(card_ints, 3)
+        )
+        self.assertEqual(indexes, set(range(1755)))
+
+    def test_get_canonical_index_count(self):
+        self.assertEqual(
+            [PokerRules.get_canonical_index_count(amount)
+             for amount in range(8)],
+            [1, 13, 169, 1755, 16432, 134459, 962988, 6009159]
+        )
+        with self.assertRaises(ValueError):
+            PokerRules.get_canonical_index_count(8)
+
+    def test_hole_class(self):
+        classes = set(
+            PokerRules.hole_class(cards)
+            for cards in itertools.combinations(
+                [Card.from_index(index) for index in range(52)], 2
+            )
+        )
+        self.assertEqual(classes, set(range(PokerRules.HOLE_CLASSES)))
+
+        for cards, expected in [('AS AD', 'AA'), ('KS AS', 'AKs'),
+                                ('KD AS', 'AKo'), ('2C 2H', '22'),
+                                ('7H 2H', '72s'), ('2H 7C', '72o')]:
+            hole_class = PokerRules.hole_class(
+                Hand.parse_cards_string(cards)
+            )
+            self.assertEqual(PokerRules.get_hole_class_name(hole_class),
+                             expected)
+            self.assertEqual(PokerRules.get_hole_class_by_name(expected),
+                             hole_class)
+
+        self.assertEqual(
+            PokerRules.hole_class(Hand.parse_cards_string('AS KS')),
+            12 * 13 + 11
+        )
+        self.assertEqual(
+            PokerRules.hole_class(Hand.parse_cards_string('AS KD')),
+            11 * 13 + 12
+        )
+
+    def test_hole_class_when_is_invalid(self):
+        with self.assertRaises(ValueError):
+            PokerRules.hole_class(Hand.parse_cards_string('AS AS'))
+        with self.assertRaises(ValueError):
+            PokerRules.hole_class(Hand.parse_cards_string('AS KS QS'))
+        with self.assertRaises(ValueError):
+            PokerRules.get_hole_class_name(169)
+        for name in ('AKx', 'KAs', 'AAs', 'A', '1Ks'):
+            with self.assertRaises(ValueError):
+                PokerRules.get_hole_class_by_name(name)
+
+    def test_get_hole_class_combos(self):
+        for name, amount in [('AA', 6), ('AKs', 4), ('AKo', 12)]:
+            combos = PokerRules.get_hole_class_combos(
+                PokerRules.get_hole_class_by_name(name)
+            )
+            self.assertEqual(len(set(combos)), amount)
+            for cards in combos:
+                self.assertEqual(
+                    PokerRules.get_hole_class_name(PokerRules.hole_class(
+                        [Card.from_int(card_int) for card_int in cards]
+                    )),
+                    name
+                )
+
+        with self.assertRaises(ValueError):
+            PokerRules.get_hole_class_combos(-1)
+
+    def test_preflop_equity(self):
+        equity = PokerRules.preflop_equity(Hand.parse_cards_string('AS AD'),
+                                           Hand.parse_cards_string('KH KC'))
+        self.assertAlmostEqual(equity, 0.82, delta=0.02)
+
+    def test_range_equity(self):
+        board = Hand.parse_cards_string('2C 7H 9D 3S')
+        hand_range = Range('AA, 99:0.5, AKs')
+        other_range = Range('KK-TT, A9s+')
+
+        # Every matchup of combos, weighted, against the exact equity.
+        expected = total = 0.0
+        for cards, weight in hand_range.get_combos(board):
+            for other_cards, other_weight in other_range.get_combos(board):
+                if set(cards).intersection(other_cards):
+                    continue
+                result = PokerRules.exact_equity(
+                    [[Card.from_int(card_int) for card_int in cards],
+                     [Card.from_int(card_int) for card_int in other_cards]],
+                    board
+                )[0]
+                expected += weight * other_weight * result['equity']
+                total += weight * other_weight
+
+        results = PokerRules.range_equity(hand_range, other_range, board)
+        self.assertAlmostEqual(results[0]['equity'], expected / total)
+        self.assertAlmostEqual(results[1]['equity'], 1 - expected / total)
+        self.assertEqual(results[0]['win'], results[1]['loss'])
+
+    def test_range_equity_when_boards_are_sampled(self):
+        results = PokerRules.range_equity(Range('AA'), Range('KK'),
+                                          iterations=500, seed=7)
+        self.assertEqual(
+            results,
+            PokerRules.range_equity(Range('AA'), Range('KK'),
+                                    iterations=500, seed=7)
+        )
+        self.assertAlmostEqual(results[0]['equity'], 0.82, delta=0.05)
+
+    def test_range_equity_when_is_invalid(self):
+        with self.assertRaises(ValueError):
+            PokerRules.range_equity(Range('AA'), Range('KK'), iterations=0)
+        with self.assertRaises(ValueError):
+            PokerRules.range_equity(Range('AsAd'), Range('KK'),
+                                    Hand.parse_cards_string('AS 2C 3D'))
+        with self.assertRaises(ValueError):
+            PokerRules.range_equity(Range('AsAd'), Range('AsAh'),
+                                    Hand.parse_cards_string('2C 3D 4H 5S'))
+
+    def test_exact_equity_when_board_is_complete(self):
+        results = PokerRules.exact_equity(
+            [Hand.parse_cards_string('AS AD'),
+             Hand.parse_cards_string('KS KD')],
+            board=Hand.parse_cards_string('KC 7H 2D 3C 9S')
+        )
+        self.assertEqual(
+            [result['equity'] for result in results], [0.0, 1.0]
+        )
+
+    def test_get_tie_break_key(self):
+        for cards_string, expected in [
+            ('TD JD QD AD KD', 0xAEDCBA),
+            ('AS 2D 3C 4H 5S', 0x554321),
+            ('3S 3D 3C KH KS', 0x73D000),
+            ('9C 4D 9S 4H KD', 0x394D00),
+            ('2C 8D 6S 8H TD', 0x28A620),
+        ]:
+            self.assertEqual(
+                Hand.from_string(cards_string).tie_break_key, expected
+            )
+
+        with self.assertRaises(ValueError):
+            PokerRules.get_tie_break_key(Hand(Hand.parse_cards_string('AS')))
+
+    def test_tie_break_keys_follow_strengths(self):
+        deck = Deck(seed=3)
+        hands = []
+        for _ in range(2000):
+            deck.shuffle()
+            hands.append(deck.deal_hand())
+
+        by_key = sorted(hands, key=lambda hand: hand.tie_break_key)
+        self.assertEqual(
+            [hand.strength for hand in by_key],
+            sorted(hand.strength for hand in hands)
+        )
+
+    def test_untie(self):
+        for method, cards_string, other_cards_string in [
+            (PokerRules.untie_four_of_a_kind, '3S 3D 3C 3H 2S',
+             '3S 3D 3C 3H 4S'),
+            (PokerRules.untie_full_house, '3S 3D 3C KH KS', '4S 4D 4C 2H 2S'),
+            (PokerRules.untie_straight, 'AS 2D 3C 4H 5S', '2S 3D 4C 5H 6S'),
+            (PokerRules.untie_two_pair, '9C 4D 9S 4H KD', '9D 4C 9H 4S AD'),
+            (PokerRules.untie_one_pair, '2C 8D 6S 8H TD', '3C 8C 6D 8S TH'),
+            (PokerRules.untie_high_card, '2C 8D 6S 9H TD', '3C 8C 6D 9S TH'),
+        ]:
+            hand = Hand.from_string(cards_string)
+            other_hand = Hand.from_string(other_cards_string)
+            self.assertEqual(method(hand, other_hand), -1)
+            self.assertEqual(method(other_hand, hand), 1)
+            self.assertEqual(method(hand, hand), 0)
+
+    def test_evaluate_uses_the_cache(self):
+        PokerRules.cache.clear()
+        hand = Hand.from_string('4D 3D 3C 7H AD')
+        same_cards = Hand.from_string('AD 7H 3C 3D 4D')
+
+        self.assertEqual(
+            PokerRules.evaluate(hand),
+            (PokerRules.ONE_PAIR, PokerRules.get_strength_by_ints(
+                hand.to_ints()
+            ))
+        )
+        self.assertEqual(PokerRules.cmp_hands(hand, same_cards), 0)
+        self.assertEqual(PokerRules.cache.stats()['misses'], 1)
+        self.assertEqual(PokerRules.cache.stats()['hits'], 2)
+
+    def test_cmp_hands(self):
+        one_pair = Hand.from_string('4D 3D 3C 7H AD')
+        two_pair = Hand.from_string('4D 3D 3C 4H AD')
+        self.assertEqual(PokerRules.cmp_hands(two_pair, one_pair), 1)
+        self.assertEqual(PokerRules.cmp_hands(one_pair, two_pair), -1)
+        self.assertEqual(PokerRules.cmp_hands(one_pair, one_pair), 0)
+
     def test_untie_royal_flush(self):
         royal_flush1 = Hand([
             Card('T', 'C'),
@@ -250,7 +933,7 @@ class TestPokerRules(unittest.TestCase):
             Card('A', 'D'),
         ])
 
-        self.assertEquals(royal_flush1, royal_flush2)
+        self.assertEqual(royal_flush1, royal_flush2)
 
     def test_untie_straight_flush(self):
         straight_flush1 = Hand([
@@ -268,7 +951,7 @@ class TestPokerRules(unittest.TestCase):
             Card('Q', 'D'),
             Card('K', 'D'),
         ])
-        self.assertEquals(straight_flush1, straight_flush2)
+        self.assertEqual(straight_flush1, straight_flush2)
 
         lower_straight_flush = Hand([
             Card('8', 'C'),
@@ -303,7 +986,7 @@ class TestPokerRules(unittest.TestCase):
             Card('9', 'S'),
             Card('K', 'C'),
         ])
-        self.assertEquals(four_of_a_kind1, four_of_a_kind2)
+        self.assertEqual(four_of_a_kind1, four_of_a_kind2)
 
         lower_four_of_a_kind = Hand([
             Card('8', 'C'),
@@ -355,7 +1038,7 @@ class TestPokerRules(unittest.TestCase):
             Card('K', 'S'),
             Card('K', 'C'),
         ])
-        self.assertEquals(full_house1, full_house2)
+        self.assertEqual(full_house1, full_house2)
 
         lower_full_house = Hand([
             Card('7', 'C'),
@@ -407,7 +1090,7 @@ class TestPokerRules(unittest.TestCase):
             Card('K', 'C'),
             Card('8', 'C'),
         ])
-        self.assertEquals(flush1, flush2)
+        self.assertEqual(flush1, flush2)
 
         lower_flush = Hand([
             Card('9', 'C'),
@@ -442,7 +1125,7 @@ class TestPokerRules(unittest.TestCase):
             Card('5', 'S'),
             Card('6', 'S'),
         ])
-        self.assertEquals(straight1, straight2)
+        self.assertEqual(straight1, straight2)
 
         lower_straight = Hand([
             Card('2', 'C'),
@@ -477,7 +1160,7 @@ class TestPokerRules(unittest.TestCase):
             Card('5', 'S'),
             Card('6', 'S'),
         ])
-        self.assertEquals(tree_of_a_kind1, tree_of_a_kind2)
+        self.assertEqual(tree_of_a_kind1, tree_of_a_kind2)
 
         lower_tree_of_a_kind = Hand([
             Card('2', 'D'),
@@ -512,7 +1195,7 @@ class TestPokerRules(unittest.TestCase):
             Card('2', 'D'),
             Card('5', 'S'),
         ])
-        self.assertEquals(two_pair1, two_pair2)
+        self.assertEqual(two_pair1, two_pair2)
 
         lower_two_pair = Hand([
             Card('2', 'C'),
@@ -581,7 +1264,7 @@ class TestPokerRules(unittest.TestCase):
             Card('5', 'S'),
             Card('6', 'S'),
         ])
-        self.assertEquals(one_pair1, one_pair2)
+        self.assertEqual(one_pair1, one_pair2)
 
         lower_one_pair = Hand([
             Card('2', 'C'),
@@ -633,7 +1316,7 @@ class TestPokerRules(unittest.TestCase):
             Card('5', 'S'),
             Card('6', 'S'),
         ])
-        self.assertEquals(high_card1, high_card2)
+        self.assertEqual(high_card1, high_card2)
 
         lower_high_card = Hand([
             Card('2', 'D'),
@@ -652,5 +1335,603 @@ class TestPokerRules(unittest.TestCase):
         ])
         self.assertGreater(higher_high_card, lower_high_card)
 
+
+class TestDeck(unittest.TestCase):
+
+    def test_deal(self):
+        deck = Deck(seed=1)
+        cards = deck.deal(52)
+
+        self.assertEqual(len(deck), 0)
+        self.assertEqual(len(set(card.to_int() for card in cards)), 52)
+
+        with self.assertRaises(ValueError):
+            deck.deal(1)
+
+    def test_deal_is_reproducible(self):
+        self.assertEqual(
+            Deck(seed=7).deal_ints(10), Deck(seed=7).deal_ints(10)
+        )
+
+    def test_deal_hand(self):
+        hand = Deck(seed=1).deal_hand()
+        self.assertTrue(hand.has_correct_amount_of_cards())
+        self.assertIsNotNone(PokerRules.get_numeric_value_by_hand(hand))
+
+    def test_shuffle(self):
+        deck = Deck(seed=1)
+        deck.deal(10)
+        deck.shuffle()
+
+        self.assertEqual(len(deck), 52)
+        self.assertEqual(len(set(deck.deal_ints(52))), 52)
+
+    def test_remove(self):
+        dead_cards = Hand.parse_cards_string('AS AD')
+        deck = Deck(dead_cards, seed=1)
+
+        self.assertEqual(len(deck), 50)
+        deck.shuffle()
+        self.assertFalse(
+            set(deck.deal_ints(50)) &
+            set(card.to_int() for card in dead_cards)
+        )
+
+        with self.assertRaises(ValueError):
+            Deck(seed=1).remove(Hand.parse_cards_string('AS AS'))
+
+    def test_rng(self):
+        class FirstCardRandom(object):
+            def random(self):
+                return 0.0
+
+        deck = Deck(rng=FirstCardRandom())
+        self.assertEqual(
+            [str(card) for card in deck.deal(2)], ['AC', '2S']
+        )
+
+
+class TestShowdown(unittest.TestCase):
+
+    def setUp(self):
+        self.showdown = Showdown(Hand.parse_cards_string('2C 7H 9D KS 3C'))
+
+    def test_resolve_with_side_pots(self):
+        self.showdown.add_player('a', Hand.parse_cards_string('AS AD'), 100)
+        self.showdown.add_player('b', Hand.parse_cards_string('KD KH'), 300)
+        self.showdown.add_player('c', Hand.parse_cards_string('QS QD'), 500)
+        self.showdown.add_player(
+            'd', Hand.parse_cards_string('JS JD'), 200, folded=True
+        )
+
+        self.assertEqual(self.showdown.rank(), [['b'], ['a'], ['c']])
+        self.assertEqual(self.showdown.pots(), [
+            {'amount': 400, 'players': ['a', 'b', 'c'], 'winners': ['b']},
+            {'amount': 500, 'players': ['b', 'c'], 'winners': ['b']},
+            {'amount': 200, 'players': ['c'], 'winners': ['c']},
+        ])
+        self.assertEqual(
+            self.showdown.resolve(), {'a': 0, 'b': 900, 'c': 200, 'd': 0}
+        )
+
+    def test_resolve_with_split_pot(self):
+        self.showdown.add_player('a', Hand.parse_cards_string('AS 4D'), 51)
+        self.showdown.add_player('b', Hand.parse_cards_string('AD 4H'), 51)
+        self.showdown.add_player('c', Hand.parse_cards_string('QS JD'), 51)
+
+        self.assertEqual(self.showdown.rank(), [['a', 'b'], ['c']])
+        self.assertEqual(
+            self.showdown.resolve(), {'a': 77, 'b': 76, 'c': 0}
+        )
+
+    def test_resolve_when_everyone_else_folded(self):
+        self.showdown.add_player('a', None, 20)
+        self.showdown.add_player(
+            'b', Hand.parse_cards_string('AS AD'), 10, folded=True
+        )
+
+        self.assertEqual(self.showdown.resolve(), {'a': 30, 'b': 0})
+
+    def test_add_player_when_is_repeated(self):
+        self.showdown.add_player('a', Hand.parse_cards_string('AS 4D'), 50)
+        with self.assertRaises(ValueError):
+            self.showdown.add_player(
+                'a', Hand.parse_cards_string('AD 4H'), 50
+            )
+
+    def test_rank_when_cards_are_repeated(self):
+        self.showdown.add_player('a', Hand.parse_cards_string('AS 4D'), 50)
+        self.showdown.add_player('b', Hand.parse_cards_string('AS 4H'), 50)
+        with self.assertRaises(ValueError):
+            self.showdown.rank()
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+        self.is_flush = PokerRules.__dict__['is_flush']
+
+    def tearDown(self):
+        self.instrumentation.disable()
+
+    def test_disabled_by_default(self):
+        self.assertFalse(PokerRules.instrumentation.enabled)
+        self.assertIs(PokerRules.__dict__['is_flush'], self.is_flush)
+
+    def test_enable(self):
+        full_house = Hand.from_string('2C 3S 2D 3D 2H')
+        full_house.tie_break_key
+        self.instrumentation.enable()
+        hand = Hand.from_string('2C 3S 2D 3D 2H')
+        PokerRules.is_flush(hand)
+        PokerRules.is_flush(hand)
+        PokerRules.classify(hand)
+        PokerRules.untie_full_house(full_house, full_house)
+
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot['PokerRules.is_flush']['calls'], 2)
+        self.assertEqual(
+            snapshot['PokerRules.classify[Full House]']['calls'], 1
+        )
+        self.assertEqual(snapshot['PokerRules.untie_full_house']['calls'], 1)
+        self.assertEqual(snapshot['Hand.from_string']['calls'], 1)
+        self.assertEqual(snapshot['Card.parse_from_string']['calls'], 5)
+        self.assertTrue(snapshot['PokerRules.is_flush']['time'] >= 0)
+
+    def test_enable_counts_the_showdown(self):
+        showdown = Showdown(Hand.parse_cards_string('2C 7H 9D KS 3C'))
+        showdown.add_player('a', Hand.parse_cards_string('AS AD'), 100)
+        showdown.add_player('b', Hand.parse_cards_string('KD KH'), 100)
+        self.instrumentation.enable()
+        showdown.rank()
+        showdown.rank()
+
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot['Showdown._get_strengths']['calls'], 2)
+        self.assertEqual(
+            snapshot['PokerRules.get_best_strength_by_ints']['calls'], 2
+        )
+        self.assertEqual(
+            snapshot['PokerRules._get_strength_by_states']['calls'], 2
+        )
+
+    def test_disable(self):
+        self.instrumentation.enable()
+        self.instrumentation.disable()
+        PokerRules.is_flush(Hand.from_string('2C 3S 2D 3D 2H'))
+
+        self.assertIs(PokerRules.__dict__['is_flush'], self.is_flush)
+        self.assertEqual(self.instrumentation.snapshot(), {})
+
+    def test_enable_with_overlapping_instances(self):
+        other = Instrumentation()
+        self.instrumentation.enable()
+        other.enable()
+        Card.parse_from_string('AS')
+        self.instrumentation.disable()
+        Card.parse_from_string('AS')
+
+        self.assertFalse(self.instrumentation.enabled)
+        self.assertTrue(other.enabled)
+        self.assertIsNot(PokerRules.__dict__['is_flush'], self.is_flush)
+
+        other.disable()
+        Card.parse_from_string('AS')
+
+        self.assertIs(PokerRules.__dict__['is_flush'], self.is_flush)
+        name = 'Card.parse_from_string'
+        self.assertEqual(self.instrumentation.snapshot()[name]['calls'], 1)
+        self.assertEqual(other.snapshot()[name]['calls'], 2)
+
+    def test_callback(self):
+        calls = []
+        self.instrumentation.enable(
+            lambda name, elapsed: calls.append(name)
+        )
+        Card.parse_from_string('AS')
+
+        self.assertEqual(calls, ['Card.parse_from_string'])
+
+    def test_reset(self):
+        self.instrumentation.enable()
+        Card.parse_from_string('AS')
+        self.instrumentation.reset()
+
+        self.assertEqual(self.instrumentation.snapshot(), {})
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def test_get(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_put_evicts_the_least_recently_used(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c'), 3)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_resize(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.resize(1)
+
+        self.assertEqual(self.cache.stats(), {
+            'capacity': 1,
+            'size': 1,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 1,
+        })
+        self.assertEqual(self.cache.get('b'), 2)
+
+    def test_resize_to_zero(self):
+        self.cache.put('a', 1)
+        self.cache.resize(0)
+
+        self.assertEqual(len(self.cache), 0)
+        self.cache.put('b', 2)
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_capacity_when_is_invalid(self):
+        with self.assertRaises(ValueError):
+            LRUCache(-1)
+        with self.assertRaises(ValueError):
+            self.cache.resize(-1)
+        self.assertEqual(self.cache.capacity, 2)
+
+    def test_clear(self):
+        self.cache.put('a', 1)
+        self.cache.get('a')
+        self.cache.clear()
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.hits, 0)
+
+
+class TestLookupTables(unittest.TestCase):
+
+    def test_generate(self):
+        flushes, unique5, products = LookupTables.generate()
+        strengths = (
+            [strength for strength in flushes if strength] +
+            [strength for strength in unique5 if strength] +
+            list(products.values())
+        )
+        self.assertEqual(
+            sorted(strengths),
+            list(range(1, LookupTables.MAX_STRENGTH + 1))
+        )
+
+    def test_generate_seven_card(self):
+        flushes, products = LookupTables.generate_seven_card()
+        self.assertEqual(len(flushes), 1 << 13)
+        self.assertEqual(flushes[0b1111111000000], LookupTables.MAX_STRENGTH)
+        self.assertEqual(flushes[0b1111], 0)
+        self.assertEqual(len(products), 6175 + 18395 + 49205)
+
+    def test_load_when_file_is_missing(self):
+        tables = LookupTables.load('/nonexistent/pypoker_tables.pickle')
+        self.assertEqual(tables, LookupTables.generate())
+
+
+class TestIncrementalEvaluator(unittest.TestCase):
+
+    def test_add(self):
+        evaluator = IncrementalEvaluator()
+        self.assertEqual(evaluator.numeric_value, None)
+
+        expected = [
+            PokerRules.HIGH_CARD, PokerRules.ONE_PAIR, PokerRules.ONE_PAIR,
+            PokerRules.TWO_PAIR, PokerRules.TWO_PAIR, PokerRules.FULL_HOUSE,
+            PokerRules.FULL_HOUSE,
+        ]
+        cards = Hand.parse_cards_string('7S 7D 2C 2H 9S') + [
+            Card.parse_from_string('7H'),
+            Card.parse_from_string('KD'),
+        ]
+        for amount, card in enumerate(cards, 1):
+            evaluator.add(card)
+            self.assertEqual(evaluator.numeric_value, expected[amount - 1])
+            if amount >= 5:
+                self.assertEqual(
+                    evaluator.strength,
+                    PokerRules.get_best_strength_by_ints(
+                        [card.to_int() for card in cards[:amount]]
+                    )
+                )
+            else:
+                self.assertEqual(evaluator.strength, 0)
+
+        self.assertEqual(len(evaluator), 7)
+        self.assertEqual([str(card) for card in evaluator.cards],
+                         [str(card) for card in cards])
+
+    def test_pop(self):
+        board = Hand.parse_cards_string('TS JS QS 2D 3C')
+        evaluator = IncrementalEvaluator(board)
+        strength = evaluator.strength
+
+        for river in Hand.parse_cards_string('AS KS 9S 2H'):
+            evaluator.pop()
+            evaluator.add(river)
+            self.assertEqual(
+                evaluator.strength,
+                PokerRules.get_best_strength_by_ints(
+                    [card.to_int() for card in board[:4] + [river]]
+                )
+            )
+            evaluator.pop()
+            evaluator.add(board[4])
+            self.assertEqual(evaluator.strength, strength)
+
+        self.assertEqual(str(evaluator.pop()), '3C')
+        self.assertEqual(evaluator.numeric_value, PokerRules.HIGH_CARD)
+
+    def test_add_when_is_invalid(self):
+        evaluator = IncrementalEvaluator(
+            Hand.parse_cards_string('AS KS QS JS TS') +
+            Hand.parse_cards_string('9S 8S')
+        )
+        with self.assertRaises(ValueError):
+            evaluator.add(Card.parse_from_string('7S'))
+
+        evaluator.pop()
+        with self.assertRaises(ValueError):
+            evaluator.add(Card.parse_from_string('AS'))
+
+    def test_pop_when_is_empty(self):
+        with self.assertRaises(ValueError):
+            IncrementalEvaluator().pop()
+
+
+class TestRange(unittest.TestCase):
+
+    def get_names(self, range_string):
+        return set(
+            PokerRules.get_hole_class_name(PokerRules.hole_class(
+                [Card.from_int(card_int) for card_int in cards]
+            ))
+            for cards in Range(range_string).combos
+        )
+
+    def test_parse(self):
+        self.assertEqual(self.get_names('QQ+'), set(['QQ', 'KK', 'AA']))
+        self.assertEqual(self.get_names('ATs+'),
+                         set(['ATs', 'AJs', 'AQs', 'AKs']))
+        self.assertEqual(self.get_names('KTs-K7s'),
+                         set(['KTs', 'K9s', 'K8s', 'K7s']))
+        self.assertEqual(self.get_names('55-77'), set(['55', '66', '77']))
+        self.assertEqual(self.get_names('AK'), set(['AKs', 'AKo']))
+        self.assertEqual(self.get_names('K9o+'),
+                         set(['K9o', 'KTo', 'KJo', 'KQo']))
+
+    def test_combos(self):
+        self.assertEqual(len(Range('QQ+, AKs, AKo')), 18 + 4 + 12)
+        self.assertEqual(list(Range('AhKh').combos),
+                         [tuple(sorted(card.to_int() for card in
+                                       Hand.parse_cards_string('AH KH')))])
+        self.assertEqual(len(Range('AA, AsAh')), 6)
+
+    def test_weights(self):
+        hand_range = Range('AK, AKo:0.5')
+        weights = sorted(hand_range.combos.values())
+        self.assertEqual(weights, [0.5] * 12 + [1.0] * 4)
+
+    def test_get_combos(self):
+        hand_range = Range('AA, KK')
+        combos = hand_range.get_combos(Hand.parse_cards_string('AS 2C'))
+        self.assertEqual(len(combos), 3 + 6)
+        self.assertEqual(len(hand_range.get_combos()), 12)
+
+    def test_parse_when_is_invalid(self):
+        for range_string in ('AKx', 'KA', 'AAs', 'QQ-AKs', 'KTs-Q9s', 'Z2',
+                             'AK:0', 'AK:x', 'AK:2', 'AsAs', 'AsKx'):
+            with self.assertRaises(ValueError):
+                Range(range_string)
+
+
+class TestPreflopEquity(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'preflop.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_equity(self):
+        classes = PokerRules.HOLE_CLASSES
+        aces = PokerRules.get_hole_class_by_name('AA')
+        suited = PokerRules.get_hole_class_by_name('AKs')
+        queens = PokerRules.get_hole_class_by_name('QQ')
+
+        kings = PokerRules.get_hole_class_by_name('KK')
+
+        self.assertEqual(PreflopEquity.get_equity(aces, aces), 0.5)
+        self.assertAlmostEqual(PreflopEquity.get_equity(suited, queens),
+                               0.4605, delta=0.0001)
+        self.assertAlmostEqual(PreflopEquity.get_equity(aces, kings),
+                               0.8195, delta=0.0001)
+        for hole_class in range(classes):
+            for other_hole_class in range(classes):
+                self.assertAlmostEqual(
+                    PreflopEquity.get_equity(hole_class, other_hole_class) +
+                    PreflopEquity.get_equity(other_hole_class, hole_class),
+                    1.0
+                )
+
+        with self.assertRaises(ValueError):
+            PreflopEquity.get_equity(aces, classes)
+
+    def test_save(self):
+        table = list(range(PokerRules.HOLE_CLASSES ** 2))
+        PreflopEquity.save(self.path, table)
+
+        self.assertEqual(list(PreflopEquity.load(self.path)), table)
+        with open(self.path, 'rb') as table_file:
+            self.assertEqual(
+                table_file.read(PreflopEquity.HEADER_SIZE + 4),
+                PreflopEquity.MAGIC + b'\x00\x00\x01\x00'
+            )
+
+    def test_load_when_file_is_invalid(self):
+        with open(self.path, 'wb') as table_file:
+            table_file.write(PreflopEquity.MAGIC + b'\x00\x00')
+
+        with self.assertRaises(ValueError):
+            PreflopEquity.load(self.path)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_count_boards(self):
+        aces = PokerRules.get_hole_class_by_name('AA')
+        suited = PokerRules.get_hole_class_by_name('AKs')
+        board_ints = tuple(
+            card.to_int()
+            for card in Hand.parse_cards_string('KS 7H 7D 2C 3C')
+        )
+        wins, ties = PreflopEquity._count_boards([(board_ints, 2)])
+
+        results = [0, 0, 0]
+        for cards in PokerRules.get_hole_class_combos(aces):
+            for other_cards in PokerRules.get_hole_class_combos(suited):
+                if len(set(cards + other_cards + board_ints)) != 9:
+                    continue
+                strength = PokerRules.get_best_strength_by_ints(
+                    cards + board_ints
+                )
+                other_strength = PokerRules.get_best_strength_by_ints(
+                    other_cards + board_ints
+                )
+                results[(strength > other_strength) -
+                        (strength < other_strength)] += 2
+
+        self.assertEqual(
+            (wins[aces, suited], ties[aces, suited], wins[suited, aces]),
+            (results[1], results[0], results[-1])
+        )
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_generate(self):
+        deck_ints = PokerRules._get_deck_ints()
+        table = PreflopEquity.generate([(tuple(deck_ints[:5]), 1),
+                                        (tuple(deck_ints[-5:]), 3)])
+        classes = PokerRules.HOLE_CLASSES
+
+        self.assertEqual(len(table), classes ** 2)
+        for hole_class in range(classes):
+            self.assertEqual(table[hole_class * classes + hole_class],
+                             PreflopEquity.SCALE // 2)
+            for other_hole_class in range(classes):
+                self.assertEqual(
+                    table[hole_class * classes + other_hole_class] +
+                    table[other_hole_class * classes + hole_class],
+                    PreflopEquity.SCALE
+                )
+
+class TestHandArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'hands.bin')
+        self.hands = [
+            Hand.from_string('TD JD QD AD KD'),
+            Hand.from_string('2C 3D 3H 3S 3D'),
+            Hand.from_string('2C TD 6S 4D 8H'),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_write(self):
+        self.assertEqual(HandArchive.write(self.path, self.hands), 3)
+        self.assertEqual(
+            os.path.getsize(self.path),
+            HandArchive.HEADER_SIZE + 3 * HandArchive.HAND_SIZE
+        )
+
+    def test_read(self):
+        HandArchive.write(self.path, self.hands)
+
+        with HandArchive(self.path) as archive:
+            self.assertEqual(len(archive), 3)
+            self.assertEqual(
+                [str(hand) for hand in archive],
+                [str(hand) for hand in self.hands]
+            )
+            self.assertEqual(str(archive[-1]), str(self.hands[-1]))
+
+            with self.assertRaises(IndexError):
+                archive[3]
+
+    def test_read_when_file_is_invalid(self):
+        with open(self.path, 'wb') as archive_file:
+            archive_file.write(b'not an archive')
+
+        with self.assertRaises(ValueError):
+            HandArchive(self.path)
+
+    def test_as_memoryview(self):
+        HandArchive.write(self.path, self.hands)
+
+        with HandArchive(self.path) as archive:
+            view = archive.as_memoryview()
+            self.assertEqual(
+                list(view[:5]),
+                [card.to_index() for card in self.hands[0].cards]
+            )
+
+        self.assertEqual(list(view[5:10]),
+                         [card.to_index() for card in self.hands[1].cards])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_evaluate(self):
+        HandArchive.write(self.path, self.hands)
+
+        with HandArchive(self.path) as archive:
+            categories, strengths = archive.evaluate()
+            self.assertEqual(archive.as_array().shape, (3, 5))
+            self.assertFalse(archive.as_array().flags.owndata)
+
+        self.assertEqual(
+            list(categories), [PokerRules.ROYAL_FLUSH,
+                               PokerRules.FOUR_OF_A_KIND,
+                               PokerRules.HIGH_CARD]
+        )
+        self.assertEqual(
+            list(strengths),
+            [PokerRules.get_strength_by_hand(hand) for hand in self.hands]
+        )
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_as_array_outlives_the_archive(self):
+        HandArchive.write(self.path, self.hands)
+
+        with HandArchive(self.path) as archive:
+            cards = archive.as_array()
+
+        self.assertEqual(list(cards[0]),
+                         [card.to_index() for card in self.hands[0].cards])
+
+    def test_read_when_file_is_empty(self):
+        open(self.path, 'wb').close()
+
+        with self.assertRaises(ValueError):
+            HandArchive(self.path)
+
 if __name__ == '__main__':
     unittest.main()
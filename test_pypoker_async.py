@@ -0,0 +1,132 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pypoker_async
+from pypoker import Card
+from pypoker import Deck
+from pypoker import Hand
+from pypoker import PokerRules
+from pypoker_async import BatchEvaluator
+
+
+class TestBatchEvaluator(unittest.IsolatedAsyncioTestCase):
+
+    async def test_evaluate(self):
+        async with BatchEvaluator() as evaluator:
+            result = await evaluator.evaluate(
+                Hand.from_string('4D 4S 4H 7H 8D')
+            )
+
+        hand = Hand.from_string('4D 4S 4H 7H 8D')
+        self.assertEqual(result, (hand.numeric_value, hand.strength))
+
+    async def test_compare(self):
+        hand = Hand.from_string('TD JD QD AD KD')
+        other_hand = Hand.from_string('2C 3D 3H 3S 3C')
+
+        async with BatchEvaluator() as evaluator:
+            self.assertEqual(await evaluator.compare(hand, other_hand), 1)
+            self.assertEqual(await evaluator.compare(other_hand, hand), -1)
+            self.assertEqual(await evaluator.compare(hand, hand), 0)
+
+    async def test_batches_by_size(self):
+        deck = Deck(seed=1)
+        card_ints = []
+        for _ in range(100):
+            deck.shuffle()
+            card_ints.append(deck.deal_ints(7))
+
+        evaluator = BatchEvaluator(batch_size=10, max_latency=60)
+        results = await asyncio.gather(
+            *[evaluator.submit_ints(cards) for cards in card_ints]
+        )
+        await evaluator.close()
+
+        self.assertEqual(evaluator.batches, 10)
+        self.assertEqual(
+            [strength for _, strength in results],
+            [PokerRules.get_best_strength_by_ints(cards)
+             for cards in card_ints]
+        )
+
+    async def test_batches_by_latency(self):
+        evaluator = BatchEvaluator(batch_size=1000, max_latency=0.01)
+        future = evaluator.submit(Hand.parse_cards_string('2C 3D 4H 5S 7C'))
+        other_future = evaluator.submit(
+            Hand.parse_cards_string('2C 3D 4H 5S 7C')
+        )
+
+        self.assertEqual(await future, (PokerRules.HIGH_CARD, 1))
+        self.assertEqual(await other_future, (PokerRules.HIGH_CARD, 1))
+        self.assertEqual(evaluator.batches, 1)
+
+    async def test_close(self):
+        evaluator = BatchEvaluator(batch_size=1000, max_latency=60,
+                                   executor=ThreadPoolExecutor(2))
+        future = evaluator.submit(Hand.parse_cards_string('2C 3D 4H 5S 7C'))
+        await evaluator.close()
+
+        self.assertTrue(future.done())
+        with self.assertRaises(RuntimeError):
+            evaluator.submit(Hand.parse_cards_string('2C 3D 4H 5S 7C'))
+        evaluator.executor.shutdown()
+
+    async def test_submit_when_is_invalid(self):
+        async with BatchEvaluator() as evaluator:
+            with self.assertRaises(ValueError):
+                evaluator.submit(Hand.parse_cards_string('2C 3D 4H'))
+
+        with self.assertRaises(ValueError):
+            BatchEvaluator(batch_size=0)
+
+    async def test_errors_are_set_on_the_futures(self):
+        def evaluate_batch(batch):
+            raise ValueError('Invalid batch')
+
+        original = pypoker_async.evaluate_batch
+        pypoker_async.evaluate_batch = evaluate_batch
+        try:
+            evaluator = BatchEvaluator(batch_size=1)
+            future = evaluator.submit(
+                Hand.parse_cards_string('2C 3D 4H 5S 7C')
+            )
+            with self.assertRaises(ValueError):
+                await future
+            await evaluator.close()
+        finally:
+            pypoker_async.evaluate_batch = original
+
+
+class TestEvaluateBatch(unittest.TestCase):
+
+    def test_evaluate_batch(self):
+        hands = [
+            Hand.from_string('TD JD QD AD KD'),
+            Hand.from_string('2C 3D 3H 3S 3C'),
+        ]
+        expected = [(hand.numeric_value, hand.strength) for hand in hands]
+        self.assertEqual(
+            pypoker_async.evaluate_batch([hand.to_ints() for hand in hands]),
+            expected
+        )
+
+    def test_evaluate_batch_when_has_more_cards(self):
+        royal_flush = Hand.parse_cards_string('TD JD QD AD KD')
+        four_of_a_kind = Hand.from_string('2C 3D 3H 3S 3C')
+        card_ints = [
+            [card.to_int() for card in royal_flush] + [
+                Card('2', 'C').to_int(), Card('3', 'C').to_int()
+            ],
+            four_of_a_kind.to_ints(),
+        ]
+
+        self.assertEqual(
+            pypoker_async.evaluate_batch(card_ints),
+            [(PokerRules.ROYAL_FLUSH, 7462),
+             (PokerRules.FOUR_OF_A_KIND, four_of_a_kind.strength)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+import pypoker_server
+from pypoker import Deck
+from pypoker import Hand
+from pypoker import PokerRules
+from pypoker_server import EvaluationClient
+
+
+class ServerTestCase(object):
+
+    def start_server(self, address):
+        self.server = pypoker_server.make_server(address)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.address = self.server.server_address
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_evaluate(self):
+        hand = Hand.from_string('4D 4S 4H 7H 8D')
+        with EvaluationClient(self.address) as client:
+            self.assertEqual(client.evaluate(hand),
+                             (hand.numeric_value, hand.strength))
+
+    def test_evaluate_many(self):
+        deck = Deck(seed=1)
+        card_ints = []
+        for amount in [5, 6, 7] * 100:
+            deck.shuffle()
+            card_ints.append(deck.deal_ints(amount))
+
+        with EvaluationClient(self.address, pool_size=1) as client:
+            results = client.evaluate_many(card_ints)
+            self.assertEqual(client.evaluate_many(card_ints), results)
+            self.assertEqual(len(client._connections), 1)
+
+        self.assertEqual(
+            [strength for _, strength in results],
+            [PokerRules.get_best_strength_by_ints(cards)
+             for cards in card_ints]
+        )
+        self.assertEqual(
+            [numeric_value for numeric_value, _ in results],
+            [PokerRules.get_numeric_value_by_strength(strength)
+             for _, strength in results]
+        )
+
+    def test_evaluate_many_when_exceeds_the_socket_buffers(self):
+        deck = Deck(seed=1)
+        card_ints = []
+        for _ in range(200):
+            deck.shuffle()
+            card_ints.append(deck.deal_ints(7))
+
+        with EvaluationClient(self.address) as client:
+            results = client.evaluate_many(card_ints * 1000)
+
+        self.assertEqual(len(results), 200000)
+        self.assertEqual(
+            [strength for _, strength in results[-200:]],
+            [PokerRules.get_best_strength_by_ints(cards)
+             for cards in card_ints]
+        )
+
+    def test_evaluate_when_is_invalid(self):
+        hand = Hand.from_string('4D 4S 4H 7H 8D')
+        with EvaluationClient(self.address) as client:
+            with self.assertRaises(ValueError):
+                client.evaluate_ints(hand.to_ints()[:4])
+            with self.assertRaises(ValueError):
+                client.evaluate_ints(hand.to_ints()[:4] * 2)
+
+            self.assertEqual(client.evaluate(hand)[1], hand.strength)
+
+    def test_generate_load(self):
+        results = pypoker_server.generate_load(
+            self.address, requests=500, concurrency=2, pipeline=16
+        )
+        self.assertEqual(results['requests'], 500)
+        self.assertTrue(results['requests_per_second'] > 0)
+        self.assertTrue(results['p99_latency'] >= results['p50_latency'])
+
+
+class TestTCPServer(ServerTestCase, unittest.TestCase):
+
+    def setUp(self):
+        self.start_server(('127.0.0.1', 0))
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets required')
+class TestUnixServer(ServerTestCase, unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.start_server(os.path.join(self.directory, 'pypoker.sock'))
+
+    def tearDown(self):
+        ServerTestCase.tearDown(self)
+        shutil.rmtree(self.directory)
+
+    def test_make_server_when_socket_is_stale(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.start_server(self.address)
+
+        hand = Hand.from_string('4D 4S 4H 7H 8D')
+        with EvaluationClient(self.address) as client:
+            self.assertEqual(client.evaluate(hand)[1], hand.strength)
+
+    def test_make_server_when_path_is_not_a_socket(self):
+        path = os.path.join(self.directory, 'pypoker.txt')
+        with open(path, 'w') as other_file:
+            other_file.write('data')
+
+        with self.assertRaises(ValueError):
+            pypoker_server.make_server(path)
+        with open(path) as other_file:
+            self.assertEqual(other_file.read(), 'data')
+
+
+class TestEvaluateRequest(unittest.TestCase):
+
+    def test_evaluate_request(self):
+        response = pypoker_server.evaluate_request((5, 51, 47, 43, 39, 35,
+                                                    0, 0))
+        self.assertEqual(pypoker_server.RESPONSE.unpack(response),
+                         (pypoker_server.OK, PokerRules.ROYAL_FLUSH, 7462))
+
+        for frame in [(4, 0, 1, 2, 3, 0, 0, 0), (5, 0, 1, 2, 3, 52, 0, 0),
+                      (5, 0, 1, 2, 3, 3, 0, 0), (8, 0, 1, 2, 3, 4, 5, 6)]:
+            self.assertEqual(
+                pypoker_server.RESPONSE.unpack(
+                    pypoker_server.evaluate_request(frame)
+                )[0],
+                pypoker_server.INVALID_REQUEST
+            )
+
+    def test_parse_address(self):
+        self.assertEqual(pypoker_server.parse_address('localhost:9000', None),
+                         ('localhost', 9000))
+        self.assertEqual(pypoker_server.parse_address(':9000', None),
+                         ('127.0.0.1', 9000))
+        self.assertEqual(
+            pypoker_server.parse_address('localhost:9000', '/tmp/socket'),
+            '/tmp/socket'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()